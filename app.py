@@ -1,20 +1,22 @@
-from flask import Flask, request, render_template_string, url_for
+from flask import Flask, Response, jsonify, request, render_template_string, url_for
+from functools import lru_cache
+import hashlib
 import io
+import math
 import base64
 import matplotlib.pyplot as plt
 import pandas as pd
-import subprocess
-import os
-
-if not os.path.exists("probability_matrix_women_likes_men.csv"):
-    print("detected first run. Attempting to generate csv templates.")
-    subprocess.run(["python", "init.py"], check=True)
-
 import numpy as np 
-from backend import run_dating_simulation, all_men_ids, all_women_ids, all_user_ids
+from backend import run_dating_simulation, run_expected_simulation, summarize_simulation, simulation_network_metrics, all_men_ids, all_women_ids, all_user_ids
+from ranking import DEFAULT_RANKING_POLICY, RANKING_POLICIES
+import results_io
 
 app = Flask(__name__)
 
+def format_count(value):
+    """Counts print as-is; expected values (floats) with one decimal."""
+    return f"{value:.1f}" if isinstance(value, float) else str(value)
+
 @app.route("/", methods=["GET", "POST"])
 def index():
     if request.method == "POST":
@@ -31,78 +33,63 @@ def index():
         except ValueError:
             return "Invalid parameter(s) provided.", 400
 
-        # Run the simulation
-        daily_logs, matches, incoming_likes = run_dating_simulation(
-            daily_queue_size=daily_queue_size,
-            weight_reciprocal=weight_reciprocal,
-            weight_queue_penalty=weight_queue_penalty,
-            export_trace=export_trace,
-            export_jack_jill_trace=export_jack_jill_trace,
-            show_match_plots=show_match_plots,
-            show_like_plots=show_like_plots,
-            plot_type=plot_type
-        )
+        # Quick preview: deterministic expected values, no trace and no plots.
+        preview = request.form.get("mode") == "preview"
 
-        full_log = pd.concat(daily_logs, ignore_index=True)
-        likes_by_men = full_log[(full_log["UserID"].str.startswith("M")) & (full_log["Decision"]=="Like")].shape[0]
-        likes_by_women = full_log[(full_log["UserID"].str.startswith("W")) & (full_log["Decision"]=="Like")].shape[0]
-        total_likes = likes_by_men + likes_by_women
-        unique_matches = sum(len(matches[uid]) for uid in all_men_ids)
-    
-        # ----- NEW METRICS: Unseen & Stale Unseen Likes -----
-        # Unseen likes: count of likes that were never seen by the recipient (still pending).
-        unseen_likes_men = 0
-        unseen_likes_women = 0
-        for uid in all_user_ids:
-            for sender, sent_day in incoming_likes[uid]:
-                if sender.startswith("M"):
-                    unseen_likes_men += 1
-                elif sender.startswith("W"):
-                    unseen_likes_women += 1
-        total_unseen = unseen_likes_men + unseen_likes_women
-        
-        # Stale Unseen likes: count of unseen likes that were not sent on day 3.
-        stale_likes_men = 0
-        stale_likes_women = 0
-        for uid in all_user_ids:
-            for sender, sent_day in incoming_likes[uid]:
-                if sent_day != 3:
-                    if sender.startswith("M"):
-                        stale_likes_men += 1
-                    elif sender.startswith("W"):
-                        stale_likes_women += 1
-        total_stale = stale_likes_men + stale_likes_women
-        
-        unseen_percent = (total_unseen / total_likes * 100) if total_likes > 0 else 0
-        stale_percent = (total_stale / total_likes * 100) if total_likes > 0 else 0
-
-        # ----- NEW METRICS: Profile views and counts of users with at least one match -----
-        profile_views_total = full_log.shape[0]
-        profile_views_men = full_log[full_log["UserID"].str.startswith("M")].shape[0]
-        profile_views_women = full_log[full_log["UserID"].str.startswith("W")].shape[0]
-        men_with_matches = sum(1 for uid in all_men_ids if len(matches[uid]) > 0)
-        women_with_matches = sum(1 for uid in all_women_ids if len(matches[uid]) > 0)
+        if preview:
+            summary = run_expected_simulation(
+                daily_queue_size=daily_queue_size,
+                weight_reciprocal=weight_reciprocal,
+                weight_queue_penalty=weight_queue_penalty
+            )
+            show_match_plots = show_like_plots = False
+        else:
+            # Run the simulation
+            daily_logs, matches, incoming_likes = run_dating_simulation(
+                daily_queue_size=daily_queue_size,
+                weight_reciprocal=weight_reciprocal,
+                weight_queue_penalty=weight_queue_penalty,
+                export_trace=export_trace,
+                export_jack_jill_trace=export_jack_jill_trace,
+                show_match_plots=show_match_plots,
+                show_like_plots=show_like_plots,
+                plot_type=plot_type
+            )
+            full_log = pd.concat(daily_logs, ignore_index=True)
+            summary = summarize_simulation(daily_logs, matches, incoming_likes)
+        n = {key: format_count(value) for key, value in summary.items()}
+        title = "Expected-Value Preview" if preview else "Tinder-Style Simulation Results"
+        preview_note = ""
+        if preview:
+            preview_note = """
+          <i>Approximate: a deterministic mean-field estimate, not the average of real runs.
+          Checked only against averages of full runs on 100 x 100 and 1000 x 1000
+          populations over a handful of lever settings: likes, matches and users with a
+          match were within about 10% at 100 x 100 and 5% at 1000 x 1000, unseen likes
+          within 8% and stale likes within 13%. Small counts (e.g. the few matches under
+          own-preference ranking) can be off by more. Other population sizes have not
+          been checked; run the full simulation for the real numbers.</i><br>"""
 
         # Prepare summary HTML in two parts.
         # Top summary (above graphs) with design matching our Tinder/Hinge redos.
         summary_top_html = f"""
         <div style='font-size:14px; line-height:1.5;'>
-          <b>=== Tinder-Style Simulation Results ===</b><br>
+          <b>=== {title} ===</b><br>{preview_note}
           <br>
-          <b># of Profile Views:</b> {profile_views_total}<br>
+          <b># of Profile Views:</b> {n['profile_views_total']}<br>
           <div style="margin-left:20px;">
-          - By men: {profile_views_men}<br>
-          - By women: {profile_views_women}
+          - By men: {n['profile_views_men']}<br>
+          - By women: {n['profile_views_women']}
           </div><br>
-          <b># of Likes Sent:</b> {total_likes}<br>
+          <b># of Likes Sent:</b> {n['total_likes']}<br>
           <div style="margin-left:20px;">
-          - By men: {likes_by_men}<br>
-          - By women: {likes_by_women}
+          - By men: {n['likes_by_men']}<br>
+          - By women: {n['likes_by_women']}
           </div><br>
-          <b># of Matches Created:</b> <span style="color:purple; font-size:20px;">{unique_matches}</span><br>
+          <b># of Matches Created:</b> <span style="color:purple; font-size:20px;">{n['unique_matches']}</span><br>
           <div style="margin-left:20px;">
-          - # of men who receive at least one match: {men_with_matches}<br>
-          - # of women who receive at least one match: {women_with_matches}
+          - # of men who receive at least one match: {n['men_with_matches']}<br>
+          - # of women who receive at least one match: {n['women_with_matches']}
           </div>
         </div>
         """
@@ -110,19 +97,44 @@ def index():
         # Bottom summary (below graphs) for the unseen metrics.
         summary_bottom_html = f"""
         <div style='font-size:14px; line-height:1.5; margin-top:20px;'>
-          <b># of Unseen Likes Sent:</b> {total_unseen} ({unseen_percent:.2f}% of likes sent)<br>
+          <b># of Unseen Likes Sent:</b> {n['total_unseen']} ({summary['unseen_percent']:.2f}% of likes sent)<br>
           <div style="margin-left:20px;">
-          - By men: {unseen_likes_men}<br>
-          - By women: {unseen_likes_women}
+          - By men: {n['unseen_likes_men']}<br>
+          - By women: {n['unseen_likes_women']}
           </div><br>
-          <b># of Stale Unseen Likes Sent:</b> {total_stale} ({stale_percent:.2f}% of likes sent)<br>
+          <b># of Stale Unseen Likes Sent:</b> {n['total_stale']} ({summary['stale_percent']:.2f}% of likes sent)<br>
           <div style="margin-left:20px;">
-          - By men: {stale_likes_men}<br>
-          - By women: {stale_likes_women}
+          - By men: {n['stale_likes_men']}<br>
+          - By women: {n['stale_likes_women']}
           </div>
         </div>
         """
 
+        # Match-network metrics (full runs only; the preview has no match graph).
+        network_html = ""
+        if not preview:
+            net = simulation_network_metrics(daily_logs, matches)
+
+            def degree_line(counts):
+                return ", ".join(f"{d}: {c}" for d, c in enumerate(counts))
+
+            network_html = f"""
+            <div style='font-size:14px; line-height:1.5; margin-top:20px;'>
+              <b>=== Match Network ===</b><br>
+              <br>
+              <b>Gini of matches:</b> men {net['gini_matches_men']:.2f}, women {net['gini_matches_women']:.2f}<br>
+              <b>Gini of likes received:</b> men {net['gini_likes_received_men']:.2f}, women {net['gini_likes_received_women']:.2f}<br>
+              <b>Share of likes going to the top 10%:</b> men {net['top_decile_like_share_men'] * 100:.1f}%, women {net['top_decile_like_share_women'] * 100:.1f}%<br>
+              <b>Match degree distribution (matches: users):</b><br>
+              <div style="margin-left:20px;">
+              - Men: {degree_line(net['match_degree_distribution_men'])}<br>
+              - Women: {degree_line(net['match_degree_distribution_women'])}
+              </div><br>
+              <b>Connected components of the match graph:</b> {net['match_components']}
+              (largest: {net['largest_match_component']} users; {net['unmatched_users']} users unmatched)
+            </div>
+            """
+
         # Generate plots
         plot_img = None
         if show_match_plots or show_like_plots:
@@ -320,12 +332,17 @@ def index():
             <div class="summary">
               {{ summary_bottom_html|safe }}
             </div>
+            {% if network_html %}
+            <div class="summary">
+              {{ network_html|safe }}
+            </div>
+            {% endif %}
             <div style="margin-top: 20px;">
               <a href="{{ url_for('index') }}">Run another simulation</a>
             </div>
           </body>
         </html>
-        """, summary_top_html=summary_top_html, summary_bottom_html=summary_bottom_html, plot_img=plot_img)
+        """, summary_top_html=summary_top_html, summary_bottom_html=summary_bottom_html, network_html=network_html, plot_img=plot_img)
 
     return render_template_string("""
     <!DOCTYPE html>
@@ -337,7 +354,7 @@ def index():
           form { max-width: 400px; }
           label { display: block; margin-top: 15px; }
           input[type="number"], input[type="text"], select { width: 100%; padding: 8px; }
-          input[type="submit"] { margin-top: 20px; padding: 10px 20px; }
+          input[type="submit"], button { margin-top: 20px; padding: 10px 20px; }
         </style>
       </head>
       <body>
@@ -372,10 +389,172 @@ def index():
           </select>
 
           <input type="submit" value="Run Simulation">
+          <button type="submit" name="mode" value="preview">Quick Preview (approximate expected values)</button>
         </form>
       </body>
     </html>
     """)
 
+##############################################################################
+# JSON / BINARY API
+##############################################################################
+# GET or POST /api/simulate returns JSON; /api/simulate.npz returns every
+# array from results_io as one .npz. Parameters come from the query string,
+# form or JSON body. Runs are seeded, so results are cached per parameter set
+# and repeated (e.g. range) requests don't re-run the simulation. mode=expected
+# returns only the summary of the deterministic preview; both responses carry
+# an "approximate" flag that is true for it.
+
+API_PARAMS = {
+    "daily_queue_size": (int, 5),
+    "weight_reciprocal": (float, 1.0),
+    "weight_queue_penalty": (float, 0.5),
+    "random_seed": (int, 42),
+    "ranking_policy": (str, DEFAULT_RANKING_POLICY),
+    "mode": (str, "stochastic"),  # or "expected"
+}
+API_GROUPS = ("summary", "user", "network", "trace")
+
+
+def api_source():
+    """
+    Where the request's parameters come from: a JSON object body if one was
+    sent, otherwise the query string and form. Raises ValueError for a JSON
+    body that is not an object.
+    """
+    if request.is_json and request.get_data():
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            raise ValueError("JSON body must be an object")
+        return data
+    return request.values
+
+
+def _cast_api_value(cast, value):
+    # JSON numbers arrive already typed: refuse to truncate 5.9 to 5 or to
+    # read true as 1.
+    if isinstance(value, bool):
+        raise ValueError
+    if cast is int and isinstance(value, float) and not value.is_integer():
+        raise ValueError
+    return cast(value)
+
+
+def parse_api_params():
+    """Validated simulation parameters from the request, or raise ValueError."""
+    source = api_source()
+    params = {}
+    for name, (cast, default) in API_PARAMS.items():
+        value = source.get(name, default)
+        try:
+            params[name] = _cast_api_value(cast, value)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"Invalid value for {name}: {value!r}") from None
+    if params["mode"] not in ("stochastic", "expected"):
+        raise ValueError("mode must be 'stochastic' or 'expected'")
+    if params["ranking_policy"] not in RANKING_POLICIES:
+        raise ValueError(f"ranking_policy must be one of {sorted(RANKING_POLICIES)}")
+    if params["daily_queue_size"] < 1:
+        raise ValueError("daily_queue_size must be at least 1")
+    if not 0 <= params["random_seed"] < 2**32:
+        raise ValueError("random_seed must be between 0 and 2**32 - 1")
+    for name in ("weight_reciprocal", "weight_queue_penalty"):
+        if not math.isfinite(params[name]) or params[name] < 0:
+            raise ValueError(f"{name} must be a finite, non-negative number")
+    return params
+
+
+def parse_api_fields():
+    """
+    Result groups to include in a JSON response: a list, or a comma-separated
+    string, of names from API_GROUPS. Raises ValueError otherwise.
+    """
+    fields = api_source().get("fields", "summary,user,network")
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    if not isinstance(fields, list) or not all(isinstance(f, str) for f in fields):
+        raise ValueError(f"fields must be a list or a comma-separated string of {list(API_GROUPS)}")
+    groups = [f.strip() for f in fields]
+    if not set(groups) <= set(API_GROUPS):
+        raise ValueError(f"fields must be a subset of {list(API_GROUPS)}")
+    return groups
+
+
+@lru_cache(maxsize=8)
+def cached_api_run(param_items):
+    """(arrays, npz bytes, etag) for one parameter set."""
+    params = dict(param_items)
+    mode = params.pop("mode")
+    if mode == "expected":
+        params.pop("random_seed")
+        arrays = results_io.summary_arrays(run_expected_simulation(**params))
+        arrays["approximate"] = np.asarray(True)
+    else:
+        daily_logs, matches, incoming_likes = run_dating_simulation(
+            show_match_plots=False, show_like_plots=False, **params
+        )
+        summary = summarize_simulation(daily_logs, matches, incoming_likes)
+        arrays = results_io.simulation_arrays(daily_logs, matches, incoming_likes, summary, all_user_ids)
+        arrays.update(results_io.summary_arrays(
+            simulation_network_metrics(daily_logs, matches), prefix="network"
+        ))
+        arrays["approximate"] = np.asarray(False)
+    npz = results_io.to_npz_bytes(arrays)
+    etag = hashlib.sha256(npz).hexdigest()[:32]
+    return arrays, npz, etag
+
+
+def encoded_response(body, mimetype, etag):
+    """
+    Response with Content-Encoding negotiated from Accept-Encoding. Range
+    requests are always served from the uncompressed body so byte offsets
+    stay meaningful; each encoding gets its own ETag.
+    """
+    if "Range" in request.headers:
+        encoding = "identity"
+    else:
+        encoding = request.accept_encodings.best_match(
+            results_io.available_encodings(), default="identity"
+        )
+    data = results_io.encode_body(body, encoding)
+    response = Response(data, mimetype=mimetype)
+    if encoding != "identity":
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept-Encoding"
+    response.set_etag(f"{etag}-{encoding}")
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(data))
+
+
+@app.route("/api/simulate", methods=["GET", "POST"])
+def api_simulate():
+    try:
+        params = parse_api_params()
+        groups = parse_api_fields()
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    arrays, _, etag = cached_api_run(tuple(sorted(params.items())))
+    payload = {
+        "params": params,
+        "approximate": bool(arrays["approximate"]),
+        **results_io.to_jsonable(arrays, groups),
+    }
+    fields_tag = hashlib.sha256(",".join(sorted(groups)).encode("utf8")).hexdigest()[:8]
+    return encoded_response(results_io.dumps(payload), "application/json", f"{etag}-{fields_tag}")
+
+
+@app.route("/api/simulate.npz", methods=["GET", "POST"])
+def api_simulate_npz():
+    try:
+        params = parse_api_params()
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    _, npz, etag = cached_api_run(tuple(sorted(params.items())))
+    response = encoded_response(npz, results_io.NPZ_MIMETYPE, etag)
+    response.headers["Content-Disposition"] = "attachment; filename=simulation.npz"
+    return response
+
+
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -4,14 +4,23 @@ import random
 import matplotlib.pyplot as plt
 import openpyxl  # for Excel export
 
+from network_stats import like_matrix, match_matrix, network_metrics
+from profile_stats import load_profile_index
+from provision import ensure_data, load_matrix
+from ranking import DEFAULT_RANKING_POLICY, get_ranking_policy, score_candidates, top_candidates
+
 ##############################################################################
 # 1) PRELOAD THE CSVs (PROFILES & PROBABILITY MATRICES)
 ##############################################################################
+# Generates the data on first run; a no-op once the manifest is in place.
+ensure_data()
+
 women_df = pd.read_csv("synthetic_women_profiles.csv")
 men_df   = pd.read_csv("synthetic_men_profiles.csv")
 
-prob_women_likes_men = pd.read_csv("probability_matrix_women_likes_men.csv", index_col=0)
-prob_men_likes_women = pd.read_csv("probability_matrix_men_likes_women.csv", index_col=0)
+# Memory-mapped from the .npy copies written by provision.py.
+prob_women_likes_men = load_matrix("probability_matrix_women_likes_men")
+prob_men_likes_women = load_matrix("probability_matrix_men_likes_women")
 
 # Create lookup dictionaries for profile info.
 women_info = {row["WomanID"]: row for _, row in women_df.iterrows()}
@@ -21,16 +30,33 @@ all_women_ids = list(women_info.keys())
 all_men_ids   = list(men_info.keys())
 all_user_ids  = all_women_ids + all_men_ids
 
+def _aligned_values(frame, rows, columns):
+    """
+    Values of `frame` in rows x columns order. When the labels are already in
+    that order (always, for generated data) this is a read-only view of the
+    memory-mapped .npy; otherwise a private reindexed copy.
+    """
+    if list(frame.index) == rows and list(frame.columns) == columns:
+        return frame.to_numpy(copy=False)
+    return frame.loc[rows, columns].to_numpy(dtype=float)
+
+# Arrays for the ranking policies, aligned with the id lists above.
+# Users are indexed globally in all_user_ids order: women first, then men.
+P_women_likes_men = _aligned_values(prob_women_likes_men, all_women_ids, all_men_ids)
+P_men_likes_women = _aligned_values(prob_men_likes_women, all_men_ids, all_women_ids)
+num_women = len(all_women_ids)
+user_index = {uid: k for k, uid in enumerate(all_user_ids)}
+
 ##############################################################################
 # 1.5) SELECT "JACK" AND "JILL" AS MIDDLE-PERFORMING PROFILES
 ##############################################################################
-man_avgs = prob_women_likes_men.mean(axis=0)
-overall_man_avg = man_avgs.mean()
-jack_id = (man_avgs - overall_man_avg).abs().idxmin()
+# Per-user desirability stats, cached on disk per matrix version. Other
+# personas: profile_stats.select_persona(profile_index, "M", 10), etc.
+profile_index = load_profile_index()
 
-woman_avgs = prob_men_likes_women.mean(axis=0)
-overall_woman_avg = woman_avgs.mean()
-jill_id = (woman_avgs - overall_woman_avg).abs().idxmin()
+# Jack/Jill: the man/woman whose mean likes received is closest to the average.
+jack_id = str(profile_index["M_ids"][profile_index["M_closest_to_mean"]])
+jill_id = str(profile_index["W_ids"][profile_index["W_closest_to_mean"]])
 
 print(f"Selected Jack: {jack_id}, Selected Jill: {jill_id}")
 
@@ -43,6 +69,7 @@ def run_dating_simulation(
     daily_queue_size=5,
     weight_reciprocal=1.0,          # weight on probability that j likes i back
     weight_queue_penalty=0.5,       # penalty if candidate's incoming-like queue is long
+    ranking_policy=DEFAULT_RANKING_POLICY,  # name in ranking.RANKING_POLICIES or a callable
     random_seed=42,
     export_trace=False,
     export_jack_jill_trace=False,
@@ -56,7 +83,8 @@ def run_dating_simulation(
 ):
     """
     Runs a Tinder-style simulation in which, upon logging in,
-    each user sees a single combined list of candidates. For each candidate:
+    each user sees a single combined list of candidates. With the default
+    "reciprocal_queue" ranking policy, each candidate is scored as follows:
     
       - If the candidate is already an incoming like (i.e. they previously liked the user),
         then the candidate’s score is defined as S̃₍ᵢⱼ₎ = Pᵢⱼ.
@@ -65,6 +93,10 @@ def run_dating_simulation(
             S₍ᵢⱼ₎ = Pᵢⱼ * 1/(1 + w_queue*Qⱼ) * (Pⱼᵢ)^(w_reciprocal)
         where Qⱼ is the number of pending likes for candidate j.
     
+    Other policies from ranking.py (or any callable with the same signature)
+    can be swapped in via `ranking_policy`; they score the whole candidate row
+    in one vectorized call and receive both weights as keyword arguments.
+    
     The top daily_queue_size candidates (by score) are shown and processed.
     
     Extra metrics (unseen and stale unseen likes) and Jack & Jill trace export are also provided.
@@ -78,6 +110,12 @@ def run_dating_simulation(
       - Like Plots: Displays likes sent per man/woman.
       - Plot Type: "Bar Chart" (individual counts) or "Histogram" (aggregated bins).
     """
+    policy = get_ranking_policy(ranking_policy)
+    policy_weights = {
+        "weight_reciprocal": weight_reciprocal,
+        "weight_queue_penalty": weight_queue_penalty,
+    }
+
     # Set seeds for reproducibility.
     np.random.seed(random_seed)
     random.seed(random_seed)
@@ -88,8 +126,15 @@ def run_dating_simulation(
     likes_sent = {uid: set() for uid in all_user_ids}
     daily_logs = []
 
-    # NEW: track which candidates each user has already seen, so they don't reappear
-    already_seen = {uid: set() for uid in all_user_ids}
+    # Array mirrors of the state above so a whole candidate row can be scored
+    # at once. queue_len[j] == len(incoming_likes[j]) with j from user_index;
+    # a True in a user's row of `unavailable` means that candidate was already
+    # seen or matched (women's rows list men, men's rows list women).
+    queue_len = np.zeros(len(all_user_ids))
+    unavailable = {
+        "W": np.zeros(P_women_likes_men.shape, dtype=bool),
+        "M": np.zeros(P_men_likes_women.shape, dtype=bool),
+    }
     
     # Loop over simulation days.
     for day in range(1, num_days + 1):
@@ -98,58 +143,49 @@ def run_dating_simulation(
         random.shuffle(login_order)
         
         for user in login_order:
+            u = user_index[user]
             # Candidate pool: opposite gender, not matched, not already seen
             if user.startswith("W"):
-                candidate_pool = [
-                    cid for cid in all_men_ids
-                    if cid not in matches[user] and cid not in already_seen[user]
-                ]
-                get_prob = lambda cand: prob_women_likes_men.loc[user, cand]
-                get_reciprocal = lambda cand: prob_men_likes_women.loc[cand, user]
+                candidate_ids = all_men_ids
+                row, cand_offset = u, num_women
+                own = P_women_likes_men[row]
+                reciprocal = P_men_likes_women[:, row]
+                user_unavailable, cand_unavailable = unavailable["W"][row], unavailable["M"]
             else:
-                candidate_pool = [
-                    cid for cid in all_women_ids
-                    if cid not in matches[user] and cid not in already_seen[user]
-                ]
-                get_prob = lambda cand: prob_men_likes_women.loc[user, cand]
-                get_reciprocal = lambda cand: prob_women_likes_men.loc[cand, user]
+                candidate_ids = all_women_ids
+                row, cand_offset = u - num_women, 0
+                own = P_men_likes_women[row]
+                reciprocal = P_women_likes_men[:, row]
+                user_unavailable, cand_unavailable = unavailable["M"][row], unavailable["W"]
+            cand_queue = queue_len[cand_offset:cand_offset + len(candidate_ids)]
+            available = ~user_unavailable
             
             # Build a lookup from candidate -> earliest sent_day
             incoming_for_user = {}
             for sender, sent_day in incoming_likes[user]:
                 if sender not in incoming_for_user or sent_day < incoming_for_user[sender]:
                     incoming_for_user[sender] = sent_day
+            incoming = np.zeros(len(candidate_ids), dtype=bool)
+            for sender in incoming_for_user:
+                incoming[user_index[sender] - cand_offset] = True
+            
+            # Score the whole candidate row and pick the top daily_queue_size
+            scores = score_candidates(
+                policy, own, reciprocal, cand_queue, incoming, available,
+                **policy_weights
+            )[0]
+            selected_candidates = top_candidates(scores, daily_queue_size)
             
-            # Build the combined candidate list
-            candidate_info = []
-            for cand in candidate_pool:
-                if cand in incoming_for_user:
-                    score = get_prob(cand)
+            # Process each selected candidate
+            for c in selected_candidates:
+                cand = candidate_ids[c]
+                if incoming[c]:
                     source = "incoming"
-                    sent_d = incoming_for_user[cand]
+                    sent_day = incoming_for_user[cand]
                 else:
-                    q = len(incoming_likes[cand])  # how many are pending for cand
-                    score = get_prob(cand) * (1/(1 + weight_queue_penalty * q)) \
-                            * (get_reciprocal(cand) ** weight_reciprocal)
                     source = "fresh"
-                    sent_d = day
-                candidate_info.append({
-                    "CandidateID": cand,
-                    "Score": score,
-                    "Source": source,
-                    "SentDay": sent_d
-                })
-            
-            # Sort by descending score, pick top daily_queue_size
-            candidate_info_sorted = sorted(candidate_info, key=lambda x: x["Score"], reverse=True)
-            selected_candidates = candidate_info_sorted[:daily_queue_size]
-            
-            # Process each selected candidate
-            for cand_record in selected_candidates:
-                cand = cand_record["CandidateID"]
-                source = cand_record["Source"]
-                sent_day = cand_record["SentDay"]
-                like_prob = get_prob(cand)
+                    sent_day = day
+                like_prob = own[c]
                 roll = np.random.rand()
                 decision = "Pass"
                 match_formed = False
@@ -159,6 +195,7 @@ def run_dating_simulation(
                     for idx, (s, sd) in enumerate(incoming_likes[user]):
                         if s == cand:
                             del incoming_likes[user][idx]
+                            queue_len[u] -= 1
                             break
 
                 # Decide like or pass
@@ -169,17 +206,19 @@ def run_dating_simulation(
                         match_formed = True
                         matches[user].add(cand)
                         matches[cand].add(user)
+                        cand_unavailable[c, row] = True
                     else:
                         likes_sent[user].add(cand)
                         if source == "fresh":
                             incoming_likes[cand].append((user, day))
+                            queue_len[user_index[cand]] += 1
                 
                 delay = day - sent_day
                 day_records.append({
                     "Day": day,
                     "UserID": user,
                     "CandidateID": cand,
-                    "Score": cand_record["Score"],
+                    "Score": scores[c],
                     "Source": source,
                     "LikeProbability": like_prob,
                     "RandomRoll": roll,
@@ -189,8 +228,316 @@ def run_dating_simulation(
                 })
 
                 # Mark cand as seen
-                already_seen[user].add(cand)
+                user_unavailable[c] = True
         
         daily_logs.append(pd.DataFrame(day_records))
     
-    return daily_logs, matches, incoming_likes
\ No newline at end of file
+    return daily_logs, matches, incoming_likes
+
+
+##############################################################################
+# 3) SUMMARY METRICS SHOWN ON THE RESULTS PAGE
+##############################################################################
+def summarize_simulation(daily_logs, matches, incoming_likes, num_days=3):
+    """
+    Headline counts for a finished run of run_dating_simulation.
+
+    Returns a dict with profile views, likes sent, matches, users with at
+    least one match, and unseen / stale unseen likes (likes still pending
+    at the end; stale ones were not sent on the last day), each split by
+    men and women where the results page shows a split.
+    """
+    full_log = pd.concat(daily_logs, ignore_index=True)
+    by_men = full_log["UserID"].str.startswith("M")
+    by_women = full_log["UserID"].str.startswith("W")
+    liked = full_log["Decision"] == "Like"
+
+    summary = {
+        "profile_views_total": full_log.shape[0],
+        "profile_views_men": int(by_men.sum()),
+        "profile_views_women": int(by_women.sum()),
+        "likes_by_men": int((by_men & liked).sum()),
+        "likes_by_women": int((by_women & liked).sum()),
+        "unique_matches": sum(len(matches[uid]) for uid in all_men_ids),
+        "men_with_matches": sum(1 for uid in all_men_ids if len(matches[uid]) > 0),
+        "women_with_matches": sum(1 for uid in all_women_ids if len(matches[uid]) > 0),
+        "unseen_likes_men": 0,
+        "unseen_likes_women": 0,
+        "stale_likes_men": 0,
+        "stale_likes_women": 0,
+    }
+
+    for uid in all_user_ids:
+        for sender, sent_day in incoming_likes[uid]:
+            side = "men" if sender.startswith("M") else "women"
+            summary["unseen_likes_" + side] += 1
+            if sent_day != num_days:
+                summary["stale_likes_" + side] += 1
+
+    return _add_summary_totals(summary)
+
+
+def _add_summary_totals(summary):
+    summary["total_likes"] = summary["likes_by_men"] + summary["likes_by_women"]
+    summary["total_unseen"] = summary["unseen_likes_men"] + summary["unseen_likes_women"]
+    summary["total_stale"] = summary["stale_likes_men"] + summary["stale_likes_women"]
+    total_likes = summary["total_likes"]
+    summary["unseen_percent"] = (summary["total_unseen"] / total_likes * 100) if total_likes > 0 else 0
+    summary["stale_percent"] = (summary["total_stale"] / total_likes * 100) if total_likes > 0 else 0
+    return summary
+
+
+##############################################################################
+# 4) EXPECTED-VALUE PREVIEW (NO RANDOM ROLLS)
+##############################################################################
+# Each side's like-probability matrix, and the other side's matrix, so that
+# P_back[:, rows].T lines up with P[rows] as (this side x other side).
+_side_matrices = {
+    "W": (P_women_likes_men, P_men_likes_women),
+    "M": (P_men_likes_women, P_women_likes_men),
+}
+_other_side = {"W": "M", "M": "W"}
+_side_names = {"W": "women", "M": "men"}
+
+
+def _row_blocks(rows, block_rows):
+    for start in range(0, len(rows), block_rows):
+        yield rows[start:start + block_rows]
+
+
+def _fill_queue(scores, masses, capacity):
+    """
+    Fractional top-k: walk each row's entries from best to worst score and
+    take as much of each entry's probability mass as still fits in
+    `capacity` expected views. Returns the mass taken per entry. Entries
+    scored -inf must carry no mass.
+    """
+    lines = np.arange(len(scores))[:, None]
+    order = np.argsort(-scores, axis=1, kind="stable")
+    sorted_mass = masses[lines, order]
+    before = np.cumsum(sorted_mass, axis=1) - sorted_mass
+    taken = np.empty_like(masses)
+    taken[lines, order] = np.clip(capacity - before, 0, sorted_mass)
+    return taken
+
+
+def _best_columns(scores, masses, capacity):
+    """
+    Column indices of each row's best-scored entries, enough of them that
+    every row holds at least `capacity` mass (or all of its columns).
+    """
+    n = scores.shape[1]
+    m = int(2 * capacity) + 8
+    while m < n:
+        head = np.argpartition(-scores, m - 1, axis=1)[:, :m]
+        if (np.take_along_axis(masses, head, axis=1).sum(axis=1) >= capacity).all():
+            return head
+        m *= 4
+    return np.tile(np.arange(n), (len(scores), 1))
+
+
+def run_expected_simulation(
+    num_days=3,
+    daily_queue_size=5,
+    weight_reciprocal=1.0,
+    weight_queue_penalty=0.5,
+    ranking_policy=DEFAULT_RANKING_POLICY,
+    cohort_size=25,
+    block_rows=256
+):
+    """
+    Deterministic mean-field version of run_dating_simulation for instant
+    lever previews. Returns the same dict as summarize_simulation, with
+    expected values in place of counts.
+
+    Instead of rolling np.random.rand() < Pᵢⱼ, state is kept as probability
+    mass per (woman, man) pair: seen (by each side), pending like (split
+    into likes the recipient can still see and "dead" ones they already
+    passed over) and match. Each candidate enters a user's list twice, as
+    an incoming like (mass = pending like from them) and as a fresh
+    candidate (the remaining unseen mass), scored by the ranking policy.
+    The best entries fill daily_queue_size expected views; viewing an
+    incoming like matches with Pᵢⱼ, a fresh like becomes pending for the
+    candidate.
+
+    The random login order is approximated by splitting each side into
+    groups of about cohort_size users that log in one after another
+    through the day, alternating which side goes first and rotating users
+    between groups from day to day. Each user is scored once per day, so
+    the cost is one pass over both matrices per day; only the best few
+    fresh candidates and the pending incoming likes are sorted. Only pairs
+    that were ever viewed are tracked, at most daily_queue_size per user
+    per day.
+
+    This is an approximation, not the Monte Carlo mean: compare with full
+    runs before relying on a number.
+    """
+    policy = get_ranking_policy(ranking_policy)
+    policy_weights = {
+        "weight_reciprocal": weight_reciprocal,
+        "weight_queue_penalty": weight_queue_penalty,
+    }
+    n_women, n_men = P_women_likes_men.shape
+    n_users = {"W": n_women, "M": n_men}
+    login_cohorts = max(1, round(max(n_women, n_men) / cohort_size))
+
+    # Per-pair state by acting side: pair_users[side][p] is the side's user
+    # in pair p, seen[side][p] that user having seen the other, and
+    # alive/dead[side][p] a pending like from them. A login views at most
+    # ceil(daily_queue_size) pairs it has not viewed before.
+    capacity = (n_women + n_men) * num_days * int(np.ceil(daily_queue_size))
+    num_pairs = 0
+    pair_users = {side: np.zeros(capacity, dtype=np.intp) for side in _side_matrices}
+    seen = {side: np.zeros(capacity) for side in _side_matrices}
+    alive = {side: np.zeros(capacity) for side in _side_matrices}
+    dead = {side: np.zeros(capacity) for side in _side_matrices}
+    match_prob = np.zeros(capacity)
+    # Qⱼ as each side sees it: expected pending likes waiting for each candidate.
+    queues = {side: np.zeros(n_users[other]) for side, other in _other_side.items()}
+
+    totals = {side: {"views": 0.0, "likes": 0.0} for side in _side_matrices}
+    # Stale likes: pending at the end and sent before the last day.
+    stale_alive = stale_dead = stale_cleared = None
+
+    for day in range(1, num_days + 1):
+        if day == num_days:
+            stale_alive = {side: alive[side].copy() for side in alive}
+            stale_dead = {side: float(dead[side].sum()) for side in dead}
+            stale_cleared = {side: 0.0 for side in alive}
+        cohort_of = {side: (np.arange(n) + day) % login_cohorts for side, n in n_users.items()}
+
+        for cohort in range(login_cohorts):
+            order = ("W", "M") if cohort % 2 == 0 else ("M", "W")
+            for side in order:
+                P, P_back = _side_matrices[side]
+                other = _other_side[side]
+                for rows in _row_blocks(np.flatnonzero(cohort_of[side] == cohort), block_rows):
+                    # This block's tracked pairs: (row, candidate) and pair id.
+                    local = np.full(n_users[side], -1)
+                    local[rows] = np.arange(len(rows))
+                    mine = np.flatnonzero(local[pair_users[side][:num_pairs]] >= 0)
+                    pr, pc = local[pair_users[side][mine]], pair_users[other][mine]
+                    unseen = 1 - seen[side][mine]
+                    incoming_mass = np.minimum(alive[other][mine], unseen)
+
+                    # Fresh candidates: everyone, less what was already seen
+                    # or is waiting as an incoming like. Keep each row's
+                    # best few holding at least a full queue of mass.
+                    own = np.asarray(P[rows])
+                    reciprocal = P_back[:, rows].T
+                    fresh_mass = np.ones(own.shape)
+                    left = unseen - incoming_mass
+                    fresh_mass[pr, pc] = np.where(left > 1e-9, left, 0)
+                    score_fresh = score_candidates(
+                        policy, own, reciprocal, queues[side],
+                        np.zeros(own.shape, dtype=bool), fresh_mass > 0, **policy_weights
+                    )
+                    head = _best_columns(score_fresh, fresh_mass, daily_queue_size)
+
+                    # Incoming likes, padded to the longest row.
+                    waiting = incoming_mass > 1e-9
+                    ir, ic, im = pr[waiting], pc[waiting], incoming_mass[waiting]
+                    by_row = np.argsort(ir, kind="stable")
+                    ir, ic, im = ir[by_row], ic[by_row], im[by_row]
+                    counts = np.bincount(ir, minlength=len(rows))
+                    slot = np.arange(len(ir)) - (np.cumsum(counts) - counts)[ir]
+                    incoming = np.zeros((len(rows), counts.max(initial=0)), dtype=np.intp)
+                    score_incoming = np.full(incoming.shape, -np.inf)
+                    mass_incoming = np.zeros(incoming.shape)
+                    incoming[ir, slot] = ic
+                    mass_incoming[ir, slot] = im
+                    score_incoming[ir, slot] = score_candidates(
+                        policy, own[ir, ic], reciprocal[ir, ic], queues[side][ic],
+                        np.ones(len(ir), dtype=bool), np.ones(len(ir), dtype=bool), **policy_weights
+                    )[0]
+
+                    candidates = np.concatenate([incoming, head], axis=1)
+                    taken = _fill_queue(
+                        np.concatenate([score_incoming, np.take_along_axis(score_fresh, head, axis=1)], axis=1),
+                        np.concatenate([mass_incoming, np.take_along_axis(fresh_mass, head, axis=1)], axis=1),
+                        daily_queue_size,
+                    )
+
+                    # Only a few entries per row are viewed: update those,
+                    # starting to track pairs viewed for the first time.
+                    row, col = np.nonzero(taken)
+                    viewed = taken[row, col]
+                    from_incoming = col < incoming.shape[1]
+                    col = candidates[row, col]
+                    keys = pr * n_users[other] + pc
+                    wanted = row * n_users[other] + col
+                    pair = np.full(len(row), -1)
+                    if len(keys):
+                        by_key = np.argsort(keys)
+                        at = by_key[np.searchsorted(keys, wanted, sorter=by_key).clip(max=len(keys) - 1)]
+                        found = keys[at] == wanted
+                        pair[found] = mine[at[found]]
+                    new = pair < 0
+                    pair[new] = np.arange(num_pairs, num_pairs + new.sum())
+                    pair_users[side][pair[new]] = rows[row[new]]
+                    pair_users[other][pair[new]] = col[new]
+                    num_pairs += int(new.sum())
+                    like_prob = own[row, col]
+                    totals[side]["views"] += float(viewed.sum())
+
+                    # Fresh likes: dead if the candidate already saw the user
+                    # and passed, otherwise pending for the candidate to see.
+                    fresh = ~from_incoming
+                    fresh_pair, back = pair[fresh], reciprocal[row[fresh], col[fresh]]
+                    back_seen = seen[other][fresh_pair]
+                    dead_share = back_seen * (1 - back) / np.maximum(1 - back_seen * back, 1e-12)
+                    fresh_likes = viewed[fresh] * like_prob[fresh]
+                    alive[side][fresh_pair] += fresh_likes * (1 - dead_share)
+                    dead[side][fresh_pair] += fresh_likes * dead_share
+                    queues[side] += np.bincount(col[fresh], weights=fresh_likes, minlength=n_users[other])
+
+                    # Viewing an incoming like clears it and matches with Pᵢⱼ.
+                    in_pair, in_viewed = pair[from_incoming], viewed[from_incoming]
+                    if stale_alive is not None:
+                        old_share = stale_alive[other][in_pair] / np.maximum(alive[other][in_pair], 1e-12)
+                        stale_cleared[other] += float((in_viewed * np.minimum(old_share, 1)).sum())
+                    cleared = np.minimum(in_viewed, alive[other][in_pair])
+                    alive[other][in_pair] -= cleared
+                    queues[other] -= np.bincount(rows[row[from_incoming]], weights=cleared,
+                                                 minlength=n_users[side])
+                    new_matches = in_viewed * like_prob[from_incoming]
+                    match_prob[in_pair] += new_matches
+
+                    for part in (from_incoming, fresh):
+                        seen[side][pair[part]] += viewed[part]
+                    totals[side]["likes"] += float(new_matches.sum() + fresh_likes.sum())
+
+    summary = {"unique_matches": float(match_prob.sum())}
+    log_no_match = np.log1p(-np.clip(match_prob[:num_pairs], 0, 1 - 1e-12))
+    for side, name in _side_names.items():
+        no_match = np.exp(np.bincount(pair_users[side][:num_pairs], weights=log_no_match, minlength=n_users[side]))
+        summary[f"{name}_with_matches"] = float((1 - no_match).sum())
+    for side, name in _side_names.items():
+        stale_likes = 0.0
+        if stale_alive is not None:
+            stale_likes = max(float(stale_alive[side].sum()) - stale_cleared[side], 0.0) + stale_dead[side]
+        summary[f"profile_views_{name}"] = totals[side]["views"]
+        summary[f"likes_by_{name}"] = totals[side]["likes"]
+        summary[f"unseen_likes_{name}"] = float(alive[side].sum() + dead[side].sum())
+        summary[f"stale_likes_{name}"] = stale_likes
+    summary["profile_views_total"] = summary["profile_views_men"] + summary["profile_views_women"]
+    return _add_summary_totals(summary)
+
+
+##############################################################################
+# 5) MATCH-NETWORK METRICS
+##############################################################################
+def simulation_network_metrics(daily_logs, matches):
+    """
+    Inequality and structure metrics (see network_stats.py) for a finished
+    run of run_dating_simulation.
+    """
+    full_log = pd.concat(daily_logs, ignore_index=True)
+    liked = full_log[full_log["Decision"] == "Like"]
+    like_csr = like_matrix(
+        liked["UserID"].map(user_index).to_numpy(),
+        liked["CandidateID"].map(user_index).to_numpy(),
+        len(all_user_ids),
+    )
+    match_csr = match_matrix(matches, all_women_ids, all_men_ids)
+    return network_metrics(match_csr, like_csr, num_women)
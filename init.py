@@ -1,8 +1,6 @@
 import numpy as np
 import pandas as pd
 
-np.random.seed(42)  # For reproducibility
-
 # Define distributions and lookup values for categories
 education_levels = ["High School", "Associate's", "Bachelor's", "Master's", "PhD", "Professional (MD/JD)"]
 # Probabilities for women's education (summing to 1)
@@ -41,76 +39,6 @@ attract_desc_men = [
     "Charming and well-groomed", "Rugged and handsome", "Model-like looks"
 ]
 
-# Assign numeric attractiveness scores (0 to 1) for each person
-women_attract_scores = np.clip(np.random.normal(loc=0.5, scale=0.15, size=100), 0, 1)
-men_attract_scores = np.random.beta(a=1.0, b=4.0, size=100)
-men_attract_scores = np.clip(men_attract_scores, 0, 1)
-
-def get_attractiveness_description(score, descriptors_list):
-    n = len(descriptors_list)
-    rank = int(score * n)
-    if rank >= n:
-        rank = n - 1
-    return descriptors_list[rank]
-
-# Generate women's profiles
-women_profiles = []
-for i in range(100):
-    age = int(np.round(np.random.normal(loc=27.0, scale=1.5)))
-    age = np.clip(age, 25, 30)
-    height = np.random.normal(loc=65.0, scale=2.5)
-    height = np.clip(height, 60, 72)
-    height = round(height, 1)
-    education = np.random.choice(education_levels, p=edu_probs_women)
-    intention = np.random.choice(dating_intentions, p=intent_probs_women)
-    drinking = np.random.choice(drinking_habits, p=drink_probs_women)
-    traits = np.random.choice(personality_traits, size=2, replace=False)
-    personality = traits[0] + " and " + traits[1]
-    attract_score = women_attract_scores[i]
-    attract_desc = get_attractiveness_description(attract_score, attract_desc_women)
-    women_profiles.append({
-        "WomanID": f"W{i+1}",
-        "Age": age,
-        "Height(inches)": height,
-        "Education": education,
-        "Dating Intentions": intention,
-        "Drinking Habits": drinking,
-        "Personality Traits": personality,
-        "Physical Attractiveness": attract_desc
-    })
-
-women_df = pd.DataFrame(women_profiles)
-women_df.to_csv("synthetic_women_profiles.csv", index=False)
-
-# Generate men's profiles
-men_profiles = []
-for j in range(100):
-    age = int(np.round(np.random.normal(loc=27.0, scale=1.5)))
-    age = np.clip(age, 25, 30)
-    height = np.random.normal(loc=70.0, scale=2.5)
-    height = np.clip(height, 64, 78)
-    height = round(height, 1)
-    education = np.random.choice(education_levels, p=edu_probs_men)
-    intention = np.random.choice(dating_intentions, p=intent_probs_men)
-    drinking = np.random.choice(drinking_habits, p=drink_probs_men)
-    traits = np.random.choice(personality_traits, size=2, replace=False)
-    personality = traits[0] + " and " + traits[1]
-    attract_score = men_attract_scores[j]
-    attract_desc = get_attractiveness_description(attract_score, attract_desc_men)
-    men_profiles.append({
-        "ManID": f"M{j+1}",
-        "Age": age,
-        "Height(inches)": height,
-        "Education": education,
-        "Dating Intentions": intention,
-        "Drinking Habits": drinking,
-        "Personality Traits": personality,
-        "Physical Attractiveness": attract_desc
-    })
-
-men_df = pd.DataFrame(men_profiles)
-men_df.to_csv("synthetic_men_profiles.csv", index=False)
-
 # Mapping for education levels (for compatibility checks)
 edu_level_index = {level: idx for idx, level in enumerate(education_levels)}
 
@@ -123,125 +51,213 @@ intent_rank = {
     "Marriage-Oriented": 4
 }
 
-# Initialize probability matrices
-prob_women_likes_men = np.zeros((100, 100))
-prob_men_likes_women = np.zeros((100, 100))
+def get_attractiveness_description(score, descriptors_list):
+    n = len(descriptors_list)
+    rank = int(score * n)
+    if rank >= n:
+        rank = n - 1
+    return descriptors_list[rank]
 
-# Calculate Women -> Men probabilities with stronger incompatibility responses
-for i, woman in enumerate(women_profiles):
-    woman_attr = women_attract_scores[i]
-    for j, man in enumerate(men_profiles):
 
-        # baseline: more attractive women are more choosy
-        p = 0.6*(0.5/woman_attr)**1
-    
-        # baseline further influenced by man's attractiveness
-        man_attr = men_attract_scores[j]
-        p *= p * man_attr
-
-        # Height compatibility: if man is shorter than woman, apply a stronger penalty.
-        if man["Height(inches)"] < woman["Height(inches)"]:
-            height_diff = woman["Height(inches)"] - man["Height(inches)"]
-            # Increase penalty: 10% per inch difference, up to 40%
-            penalty = 1 - min(0.10 * height_diff, 0.40)
-            p *= penalty
-
-        # Education compatibility: stronger penalties for education mismatches.
-        woman_edu_level = edu_level_index[woman["Education"]]
-        man_edu_level = edu_level_index[man["Education"]]
-        edu_diff = woman_edu_level - man_edu_level
-        if edu_diff >= 2:
-            p *= 0.3  # larger penalty for a two-level gap
-        elif edu_diff == 1:
-            p *= 0.6  # penalty for a one-level gap
-
-        # Dating intentions: stronger penalty for mismatches.
-        w_intent = woman["Dating Intentions"]
-        m_intent = man["Dating Intentions"]
-        if w_intent == m_intent:
-            p *= 1.1  # slight boost for matching
-        else:
-            # If woman is serious and man is casual:
-            if (w_intent in ["Long-term", "Marriage-Oriented"]) and m_intent == "Casual":
-                p *= 0.3
-            # If man is serious and woman is casual:
-            elif (m_intent in ["Long-term", "Marriage-Oriented"]) and w_intent == "Casual":
-                p *= 0.5
-            # If one is serious and the other is "Figuring it Out":
-            if (w_intent in ["Long-term", "Marriage-Oriented"]) and m_intent == "Figuring it Out":
-                p *= 0.7
-            elif (m_intent in ["Long-term", "Marriage-Oriented"]) and w_intent == "Figuring it Out":
-                p *= 0.8
-
-        # Drinking compatibility: stronger penalty for a major mismatch.
-        w_drink = woman["Drinking Habits"]
-        m_drink = man["Drinking Habits"]
-        drink_scale = {"Never": 0, "Socially": 1, "Often": 2}
-        drink_diff = abs(drink_scale[w_drink] - drink_scale[m_drink])
-        if drink_diff == 2:
-            p *= 0.8  # stronger penalty
-
-        # Removed clamp; assign raw probability directly
-        prob_women_likes_men[i, j] = p
-
-# Scale the Women->Men matrix to target an average of ~12%
-avg_prob_women = prob_women_likes_men.mean()
-if avg_prob_women < 0.10 or avg_prob_women > 0.15:
-    scale_factor = 0.12 / avg_prob_women
-    prob_women_likes_men *= scale_factor
-
-# Apply logistic transformation: p* = p/(p+1)
-prob_women_likes_men = prob_women_likes_men / (prob_women_likes_men + 1)
-
-# Calculate Men -> Women probabilities with stronger incompatibility responses
-for j, man in enumerate(men_profiles):
-    man_attr = men_attract_scores[j]
+def generate_data(num_women=100, num_men=100, seed=42):
+    """
+    Generate synthetic profiles and like-probability matrices.
+
+    Returns a dict of DataFrames keyed by output file name (without the
+    .csv extension). Writing them to disk is handled by provision.py so
+    that concurrent workers never see half-written files.
+    """
+    np.random.seed(seed)  # For reproducibility
+
+    # Assign numeric attractiveness scores (0 to 1) for each person
+    women_attract_scores = np.clip(np.random.normal(loc=0.5, scale=0.15, size=num_women), 0, 1)
+    men_attract_scores = np.random.beta(a=1.0, b=4.0, size=num_men)
+    men_attract_scores = np.clip(men_attract_scores, 0, 1)
+
+    # Generate women's profiles
+    women_profiles = []
+    for i in range(num_women):
+        age = int(np.round(np.random.normal(loc=27.0, scale=1.5)))
+        age = np.clip(age, 25, 30)
+        height = np.random.normal(loc=65.0, scale=2.5)
+        height = np.clip(height, 60, 72)
+        height = round(height, 1)
+        education = np.random.choice(education_levels, p=edu_probs_women)
+        intention = np.random.choice(dating_intentions, p=intent_probs_women)
+        drinking = np.random.choice(drinking_habits, p=drink_probs_women)
+        traits = np.random.choice(personality_traits, size=2, replace=False)
+        personality = traits[0] + " and " + traits[1]
+        attract_score = women_attract_scores[i]
+        attract_desc = get_attractiveness_description(attract_score, attract_desc_women)
+        women_profiles.append({
+            "WomanID": f"W{i+1}",
+            "Age": age,
+            "Height(inches)": height,
+            "Education": education,
+            "Dating Intentions": intention,
+            "Drinking Habits": drinking,
+            "Personality Traits": personality,
+            "Physical Attractiveness": attract_desc
+        })
+
+    women_df = pd.DataFrame(women_profiles)
+
+    # Generate men's profiles
+    men_profiles = []
+    for j in range(num_men):
+        age = int(np.round(np.random.normal(loc=27.0, scale=1.5)))
+        age = np.clip(age, 25, 30)
+        height = np.random.normal(loc=70.0, scale=2.5)
+        height = np.clip(height, 64, 78)
+        height = round(height, 1)
+        education = np.random.choice(education_levels, p=edu_probs_men)
+        intention = np.random.choice(dating_intentions, p=intent_probs_men)
+        drinking = np.random.choice(drinking_habits, p=drink_probs_men)
+        traits = np.random.choice(personality_traits, size=2, replace=False)
+        personality = traits[0] + " and " + traits[1]
+        attract_score = men_attract_scores[j]
+        attract_desc = get_attractiveness_description(attract_score, attract_desc_men)
+        men_profiles.append({
+            "ManID": f"M{j+1}",
+            "Age": age,
+            "Height(inches)": height,
+            "Education": education,
+            "Dating Intentions": intention,
+            "Drinking Habits": drinking,
+            "Personality Traits": personality,
+            "Physical Attractiveness": attract_desc
+        })
+
+    men_df = pd.DataFrame(men_profiles)
+
+    # Initialize probability matrices
+    prob_women_likes_men = np.zeros((num_women, num_men))
+    prob_men_likes_women = np.zeros((num_men, num_women))
+
+    # Calculate Women -> Men probabilities with stronger incompatibility responses
     for i, woman in enumerate(women_profiles):
         woman_attr = women_attract_scores[i]
-        # Combined baseline based on woman's attractiveness + hotter men are more choosy
-        p = 0.15 + 0.5 * woman_attr * (1/man_attr)**0.5  # baseline
-
-        # Height: if woman is taller than man, apply a stronger penalty.
-        if woman["Height(inches)"] > man["Height(inches)"]:
-            p *= 0.90  # increased penalty
-
-        # Dating intentions: stronger penalty for mismatches.
-        w_intent = woman["Dating Intentions"]
-        m_intent = man["Dating Intentions"]
-        if w_intent == m_intent:
-            p *= 1.05
-        else:
-            if (w_intent in ["Long-term", "Marriage-Oriented"]) and m_intent == "Casual":
-                p *= 0.6  # stronger penalty than before
-            elif (m_intent in ["Long-term", "Marriage-Oriented"]) and w_intent == "Casual":
-                p *= 0.8  # stronger penalty than before
-
-        # Drinking compatibility: stronger penalty for major mismatch.
-        w_drink = woman["Drinking Habits"]
-        m_drink = man["Drinking Habits"]
-        drink_scale = {"Never": 0, "Socially": 1, "Often": 2}
-        drink_diff = abs(drink_scale[w_drink] - drink_scale[m_drink])
-        if drink_diff == 2:
-            p *= 0.90  # stronger penalty
-
-        # Removed clamp; assign raw probability directly
-        prob_men_likes_women[j, i] = p
-
-# Scale the Men->Women matrix to target an average of ~43%
-avg_prob_men = prob_men_likes_women.mean()
-if avg_prob_men < 0.60 or avg_prob_men > 0.65:
-    scale_factor = 0.63 / avg_prob_men
-    prob_men_likes_women *= scale_factor
-
-# Apply logistic transformation: p* = p/(p+1)
-prob_men_likes_women = prob_men_likes_women / (prob_men_likes_women + 1)
-
-# Create DataFrames for the matrices and save to CSV files.
-women_ids = [f"W{k+1}" for k in range(100)]
-men_ids   = [f"M{k+1}" for k in range(100)]
-
-wm_df = pd.DataFrame(prob_women_likes_men, index=women_ids, columns=men_ids)
-wm_df.to_csv("probability_matrix_women_likes_men.csv", index_label="Woman")
-
-mw_df = pd.DataFrame(prob_men_likes_women, index=men_ids, columns=women_ids)
-mw_df.to_csv("probability_matrix_men_likes_women.csv", index_label="Man")
\ No newline at end of file
+        for j, man in enumerate(men_profiles):
+
+            # baseline: more attractive women are more choosy
+            p = 0.6*(0.5/woman_attr)**1
+
+            # baseline further influenced by man's attractiveness
+            man_attr = men_attract_scores[j]
+            p *= p * man_attr
+
+            # Height compatibility: if man is shorter than woman, apply a stronger penalty.
+            if man["Height(inches)"] < woman["Height(inches)"]:
+                height_diff = woman["Height(inches)"] - man["Height(inches)"]
+                # Increase penalty: 10% per inch difference, up to 40%
+                penalty = 1 - min(0.10 * height_diff, 0.40)
+                p *= penalty
+
+            # Education compatibility: stronger penalties for education mismatches.
+            woman_edu_level = edu_level_index[woman["Education"]]
+            man_edu_level = edu_level_index[man["Education"]]
+            edu_diff = woman_edu_level - man_edu_level
+            if edu_diff >= 2:
+                p *= 0.3  # larger penalty for a two-level gap
+            elif edu_diff == 1:
+                p *= 0.6  # penalty for a one-level gap
+
+            # Dating intentions: stronger penalty for mismatches.
+            w_intent = woman["Dating Intentions"]
+            m_intent = man["Dating Intentions"]
+            if w_intent == m_intent:
+                p *= 1.1  # slight boost for matching
+            else:
+                # If woman is serious and man is casual:
+                if (w_intent in ["Long-term", "Marriage-Oriented"]) and m_intent == "Casual":
+                    p *= 0.3
+                # If man is serious and woman is casual:
+                elif (m_intent in ["Long-term", "Marriage-Oriented"]) and w_intent == "Casual":
+                    p *= 0.5
+                # If one is serious and the other is "Figuring it Out":
+                if (w_intent in ["Long-term", "Marriage-Oriented"]) and m_intent == "Figuring it Out":
+                    p *= 0.7
+                elif (m_intent in ["Long-term", "Marriage-Oriented"]) and w_intent == "Figuring it Out":
+                    p *= 0.8
+
+            # Drinking compatibility: stronger penalty for a major mismatch.
+            w_drink = woman["Drinking Habits"]
+            m_drink = man["Drinking Habits"]
+            drink_scale = {"Never": 0, "Socially": 1, "Often": 2}
+            drink_diff = abs(drink_scale[w_drink] - drink_scale[m_drink])
+            if drink_diff == 2:
+                p *= 0.8  # stronger penalty
+
+            # Removed clamp; assign raw probability directly
+            prob_women_likes_men[i, j] = p
+
+    # Scale the Women->Men matrix to target an average of ~12%
+    avg_prob_women = prob_women_likes_men.mean()
+    if avg_prob_women < 0.10 or avg_prob_women > 0.15:
+        scale_factor = 0.12 / avg_prob_women
+        prob_women_likes_men *= scale_factor
+
+    # Apply logistic transformation: p* = p/(p+1)
+    prob_women_likes_men = prob_women_likes_men / (prob_women_likes_men + 1)
+
+    # Calculate Men -> Women probabilities with stronger incompatibility responses
+    for j, man in enumerate(men_profiles):
+        man_attr = men_attract_scores[j]
+        for i, woman in enumerate(women_profiles):
+            woman_attr = women_attract_scores[i]
+            # Combined baseline based on woman's attractiveness + hotter men are more choosy
+            p = 0.15 + 0.5 * woman_attr * (1/man_attr)**0.5  # baseline
+
+            # Height: if woman is taller than man, apply a stronger penalty.
+            if woman["Height(inches)"] > man["Height(inches)"]:
+                p *= 0.90  # increased penalty
+
+            # Dating intentions: stronger penalty for mismatches.
+            w_intent = woman["Dating Intentions"]
+            m_intent = man["Dating Intentions"]
+            if w_intent == m_intent:
+                p *= 1.05
+            else:
+                if (w_intent in ["Long-term", "Marriage-Oriented"]) and m_intent == "Casual":
+                    p *= 0.6  # stronger penalty than before
+                elif (m_intent in ["Long-term", "Marriage-Oriented"]) and w_intent == "Casual":
+                    p *= 0.8  # stronger penalty than before
+
+            # Drinking compatibility: stronger penalty for major mismatch.
+            w_drink = woman["Drinking Habits"]
+            m_drink = man["Drinking Habits"]
+            drink_scale = {"Never": 0, "Socially": 1, "Often": 2}
+            drink_diff = abs(drink_scale[w_drink] - drink_scale[m_drink])
+            if drink_diff == 2:
+                p *= 0.90  # stronger penalty
+
+            # Removed clamp; assign raw probability directly
+            prob_men_likes_women[j, i] = p
+
+    # Scale the Men->Women matrix to target an average of ~43%
+    avg_prob_men = prob_men_likes_women.mean()
+    if avg_prob_men < 0.60 or avg_prob_men > 0.65:
+        scale_factor = 0.63 / avg_prob_men
+        prob_men_likes_women *= scale_factor
+
+    # Apply logistic transformation: p* = p/(p+1)
+    prob_men_likes_women = prob_men_likes_women / (prob_men_likes_women + 1)
+
+    # Create DataFrames for the matrices.
+    women_ids = [f"W{k+1}" for k in range(num_women)]
+    men_ids   = [f"M{k+1}" for k in range(num_men)]
+
+    wm_df = pd.DataFrame(prob_women_likes_men, index=pd.Index(women_ids, name="Woman"), columns=men_ids)
+    mw_df = pd.DataFrame(prob_men_likes_women, index=pd.Index(men_ids, name="Man"), columns=women_ids)
+
+    return {
+        "synthetic_women_profiles": women_df,
+        "synthetic_men_profiles": men_df,
+        "probability_matrix_women_likes_men": wm_df,
+        "probability_matrix_men_likes_women": mw_df,
+    }
+
+
+if __name__ == "__main__":
+    from provision import ensure_data
+    ensure_data(force=True)
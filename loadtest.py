@@ -0,0 +1,415 @@
+"""
+Offline load-test harness and capacity model for the Flask app.
+
+Drives the app in-process (or a running server via --url) with a closed loop
+of concurrent clients cycling through a mix of parameter sets, then reports
+p50/p95/p99 latency, throughput and per-worker RSS for each execution
+backend:
+
+  sync     one worker serving one request at a time (gunicorn sync, 1 worker)
+  gthread  one process, --threads requests at a time (gunicorn gthread)
+  process  --workers processes, each serving one request at a time
+           (gunicorn sync with several workers)
+
+Examples:
+  python loadtest.py --requests 60 --concurrency 4
+  python loadtest.py --backends process --workers 2 --population 300
+  python loadtest.py --url http://127.0.0.1:8000 --pids 1234 1235
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+##############################################################################
+# 1) REQUEST MIX
+##############################################################################
+DEFAULT_MIX = [
+    {"daily_queue_size": q, "weight_reciprocal": wr, "weight_queue_penalty": wq}
+    for q in (5, 10, 20)
+    for wr, wq in ((0.0, 0.0), (1.0, 0.5))
+]
+
+
+def mix_label(params):
+    return ",".join(f"{k}={v}" for k, v in sorted(params.items()))
+
+
+def build_form(params, endpoint, plots, request_number):
+    form = {k: str(v) for k, v in params.items()}
+    if endpoint == "/api/simulate" and "random_seed" not in params:
+        # The API caches results per parameter set; vary the seed so every
+        # request is a real simulation run.
+        form["random_seed"] = str(request_number)
+    if endpoint == "/" and plots:
+        form.update(show_match_plots="on", show_like_plots="on", plot_type="Bar Chart")
+    return form
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def pid_rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+##############################################################################
+# 2) BACKENDS
+##############################################################################
+# Each backend exposes call(endpoint, form) -> (ok, pid, rss_mb, service_s) and
+# close(). service_s is the time spent inside the app, excluding queueing.
+
+_worker_client = None
+
+
+def _load_app(data_dir):
+    """
+    Import the app with `data_dir` as working directory (backend reads its
+    data from cwd at import time), then restore the caller's cwd so relative
+    paths such as --json keep working.
+    """
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+    cwd = os.getcwd()
+    if data_dir:
+        os.chdir(data_dir)
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    # Start cold, as a freshly booted worker would (forked workers would
+    # otherwise inherit the parent's cached API results).
+    app.cached_api_run.cache_clear()
+    return app.app
+
+
+def _init_worker(data_dir):
+    global _worker_client
+    _worker_client = _load_app(data_dir).test_client()
+
+
+def _worker_request(endpoint, form):
+    start = time.perf_counter()
+    response = _worker_client.post(endpoint, data=form)
+    service = time.perf_counter() - start
+    return response.status_code < 400, os.getpid(), current_rss_mb(), service
+
+
+class SyncBackend:
+    """A single worker: concurrent clients queue for it."""
+
+    def __init__(self, data_dir):
+        self.client = _load_app(data_dir).test_client()
+        self.lock = threading.Lock()
+
+    def call(self, endpoint, form):
+        with self.lock:
+            start = time.perf_counter()
+            response = self.client.post(endpoint, data=form)
+            service = time.perf_counter() - start
+        return response.status_code < 400, os.getpid(), current_rss_mb(), service
+
+    def close(self):
+        pass
+
+
+class ThreadBackend:
+    """One process handling up to `threads` requests at once."""
+
+    def __init__(self, data_dir, threads):
+        self.app = _load_app(data_dir)
+        self.slots = threading.Semaphore(threads)
+
+    def call(self, endpoint, form):
+        with self.slots:
+            start = time.perf_counter()
+            response = self.app.test_client().post(endpoint, data=form)
+            service = time.perf_counter() - start
+        return response.status_code < 400, os.getpid(), current_rss_mb(), service
+
+    def close(self):
+        pass
+
+
+class ProcessBackend:
+    """`workers` separate processes, each with its own copy of the app."""
+
+    def __init__(self, data_dir, workers):
+        self.pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(data_dir,))
+        # Boot every worker before timing starts.
+        list(self.pool.map(_warmup, range(workers)))
+
+    def call(self, endpoint, form):
+        return self.pool.submit(_worker_request, endpoint, form).result()
+
+    def close(self):
+        self.pool.shutdown()
+
+
+def _warmup(_):
+    time.sleep(0.2)  # keep each task on a distinct worker
+    return os.getpid()
+
+
+class HttpBackend:
+    """A server started separately, e.g. `gunicorn -k gthread --threads 4 app:app`."""
+
+    def __init__(self, url, pids):
+        self.url = url.rstrip("/")
+        self.pids = pids
+
+    def call(self, endpoint, form):
+        data = urllib.parse.urlencode(form).encode("utf8")
+        try:
+            with urllib.request.urlopen(self.url + endpoint, data=data, timeout=300) as response:
+                response.read()
+                ok = response.status < 400
+        except OSError:
+            ok = False
+        return ok, None, None, None
+
+    def worker_rss(self):
+        return {pid: pid_rss_mb(pid) for pid in self.pids}
+
+    def close(self):
+        pass
+
+
+##############################################################################
+# 3) CLOSED-LOOP DRIVER
+##############################################################################
+def run_load(backend, mix, endpoint, plots, num_requests, concurrency):
+    """
+    Send `num_requests` requests from `concurrency` client threads, cycling
+    through `mix`. Latency is measured client-side, so it includes queueing.
+    """
+    jobs = itertools.cycle(enumerate(mix))
+    jobs_lock = threading.Lock()
+    remaining = [num_requests]
+    samples = []
+
+    def client():
+        while True:
+            with jobs_lock:
+                if remaining[0] == 0:
+                    return
+                remaining[0] -= 1
+                request_number = num_requests - remaining[0]
+                _, params = next(jobs)
+            form = build_form(params, endpoint, plots, request_number)
+            start = time.perf_counter()
+            error = None
+            try:
+                ok, pid, rss, service = backend.call(endpoint, form)
+            except Exception as e:  # e.g. BrokenProcessPool: a failed request, not a lost client
+                ok, pid, rss, service = False, None, None, None
+                error = f"{type(e).__name__}: {e}"
+            samples.append({
+                "label": mix_label(params),
+                "latency": time.perf_counter() - start,
+                "service": service,
+                "ok": ok,
+                "pid": pid,
+                "rss_mb": rss,
+                "error": error,
+            })
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as clients:
+        futures = [clients.submit(client) for _ in range(concurrency)]
+    wall = time.perf_counter() - start
+    for future in futures:
+        future.result()  # re-raise anything that escaped a client thread
+    return samples, wall
+
+
+def summarize_load(samples, wall, worker_rss=None):
+    latencies = np.array([s["latency"] for s in samples if s["ok"]])
+    service = np.array([s["service"] for s in samples if s["ok"] and s["service"] is not None])
+    p50, p95, p99 = (np.percentile(latencies, [50, 95, 99]) * 1000) if len(latencies) else (math.nan,) * 3
+    if worker_rss is None:
+        worker_rss = {}
+        for s in samples:
+            if s["pid"] is not None:
+                worker_rss[s["pid"]] = max(worker_rss.get(s["pid"], 0.0), s["rss_mb"])
+    by_label = {}
+    for s in samples:
+        if s["ok"]:
+            by_label.setdefault(s["label"], []).append(s["latency"] * 1000)
+    return {
+        "requests": len(samples),
+        "errors": sum(not s["ok"] for s in samples),
+        "error_messages": sorted({s["error"] for s in samples if s.get("error")}),
+        "wall_s": wall,
+        "throughput_rps": len(latencies) / wall if wall > 0 else math.nan,
+        "mean_ms": float(latencies.mean() * 1000) if len(latencies) else math.nan,
+        "mean_service_ms": float(service.mean() * 1000) if len(service) else None,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "worker_rss_mb": {str(pid): rss for pid, rss in worker_rss.items()},
+        "p50_ms_by_params": {label: float(np.median(v)) for label, v in sorted(by_label.items())},
+    }
+
+
+##############################################################################
+# 4) CAPACITY MODEL
+##############################################################################
+def capacity_model(result, dyno_memory_mb, dyno_cpus, target_rps, reserve_mb=64):
+    """
+    Size dynos from one backend's measurements.
+
+    A request is CPU-bound, so per-dyno throughput is capped both by how
+    many workers fit in memory and by the number of CPUs:
+      workers/dyno = floor((memory - reserve) / RSS per worker)
+      rps/dyno     = min(workers, cpus) / mean service time
+    A worker's rate is the better of 1 / mean service time (measured inside
+    the app) and the observed throughput split across workers; the latter
+    is what counts for gthread, whose overlapping requests each take longer.
+    With --url only throughput is known. Measure with no more busy workers
+    than CPUs, or CPU contention makes the estimate pessimistic.
+    """
+    rss = [v for v in result["worker_rss_mb"].values() if v]
+    if not rss:
+        return None
+    rss_per_worker = max(rss)
+    workers = max(int((dyno_memory_mb - reserve_mb) // rss_per_worker), 0)
+    per_worker_rps = result["throughput_rps"] / len(rss)
+    if result["mean_service_ms"]:
+        per_worker_rps = max(per_worker_rps, 1000 / result["mean_service_ms"])
+    rps_per_dyno = min(workers, dyno_cpus) * per_worker_rps
+    return {
+        "rss_per_worker_mb": rss_per_worker,
+        "workers_per_dyno": workers,
+        "rps_per_worker": per_worker_rps,
+        "rps_per_dyno": rps_per_dyno,
+        "dynos_for_target": math.ceil(target_rps / rps_per_dyno) if rps_per_dyno > 0 else None,
+    }
+
+
+##############################################################################
+# 5) CLI
+##############################################################################
+def prepare_population(size):
+    """Provision a size x size dataset in a cache directory and return it."""
+    sys.path.insert(0, REPO_DIR)
+    from provision import ensure_data
+
+    data_dir = os.path.join(tempfile.gettempdir(), f"datingsim_loadtest_{size}")
+    ensure_data(data_dir, num_women=size, num_men=size)
+    return data_dir
+
+
+def make_backend(name, args, data_dir):
+    if name == "sync":
+        return SyncBackend(data_dir)
+    if name == "gthread":
+        return ThreadBackend(data_dir, args.threads)
+    if name == "process":
+        return ProcessBackend(data_dir, args.workers)
+    raise ValueError(f"Unknown backend {name!r}")
+
+
+def print_report(name, result, capacity):
+    print(f"\n=== {name} ===")
+    print(f"requests: {result['requests']}  errors: {result['errors']}  wall: {result['wall_s']:.2f}s")
+    for message in result["error_messages"]:
+        print(f"error: {message}")
+    print(f"throughput: {result['throughput_rps']:.2f} req/s")
+    print(f"latency ms: p50 {result['p50_ms']:.0f}  p95 {result['p95_ms']:.0f}  p99 {result['p99_ms']:.0f}")
+    if result["mean_service_ms"]:
+        print(f"mean service time: {result['mean_service_ms']:.0f} ms")
+    for pid, rss in result["worker_rss_mb"].items():
+        print(f"worker {pid}: RSS {rss:.0f} MB" if rss else f"worker {pid}: RSS unknown")
+    for label, p50 in result["p50_ms_by_params"].items():
+        print(f"  p50 {p50:8.0f} ms  {label}")
+    if capacity:
+        print(
+            f"capacity: {capacity['workers_per_dyno']} workers/dyno, "
+            f"{capacity['rps_per_dyno']:.2f} req/s/dyno, "
+            f"{capacity['dynos_for_target']} dyno(s) for target"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="sync,gthread,process",
+                        help="comma-separated subset of sync,gthread,process (ignored with --url)")
+    parser.add_argument("--url", help="drive a running server instead of the in-process app")
+    parser.add_argument("--pids", type=int, nargs="*", default=[], help="server worker pids to sample RSS from (--url)")
+    parser.add_argument("--endpoint", default="/", choices=["/", "/api/simulate"])
+    parser.add_argument("--no-plots", action="store_true", help="don't request plots from /")
+    parser.add_argument("--mix-file", help="JSON list of parameter dicts (default: queue sizes 5/10/20 x two lever settings)")
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4, help="gthread: threads per worker")
+    parser.add_argument("--workers", type=int, default=2, help="process: worker processes")
+    parser.add_argument("--population", type=int, help="users per side; generates a dataset of that size (default: the repo's data)")
+    parser.add_argument("--dyno-memory-mb", type=float, default=512)
+    parser.add_argument("--dyno-cpus", type=int, default=1)
+    parser.add_argument("--target-rps", type=float, default=1.0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    mix = DEFAULT_MIX
+    if args.mix_file:
+        with open(args.mix_file) as f:
+            mix = json.load(f)
+    data_dir = prepare_population(args.population) if args.population else REPO_DIR
+
+    if args.url:
+        names = ["http"]
+    else:
+        names = [n for n in args.backends.split(",") if n]
+
+    results = {}
+    for name in names:
+        backend = HttpBackend(args.url, args.pids) if name == "http" else make_backend(name, args, data_dir)
+        try:
+            samples, wall = run_load(backend, mix, args.endpoint, not args.no_plots,
+                                     args.requests, args.concurrency)
+            worker_rss = backend.worker_rss() if name == "http" else None
+        finally:
+            backend.close()
+        result = summarize_load(samples, wall, worker_rss)
+        result["capacity"] = capacity_model(result, args.dyno_memory_mb, args.dyno_cpus, args.target_rps)
+        results[name] = result
+        print_report(name, result, result["capacity"])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+##############################################################################
+# MATCH-NETWORK ANALYTICS
+##############################################################################
+# Inequality and structure metrics over a finished run. Matches and likes are
+# turned into sparse (CSR) biadjacency matrices, women x men for matches and
+# sender x recipient (all users) for likes, so every metric is a vectorized
+# reduction over degrees instead of a loop over dict-of-sets.
+
+SIDES = {"W": "women", "M": "men"}
+
+
+def match_matrix(matches, women_ids, men_ids):
+    """Women x men CSR biadjacency of the final matches dict (uid -> set of uids)."""
+    man_index = {uid: k for k, uid in enumerate(men_ids)}
+    rows = []
+    cols = []
+    for w, uid in enumerate(women_ids):
+        partners = matches[uid]
+        rows.extend([w] * len(partners))
+        cols.extend(man_index[m] for m in partners)
+    data = np.ones(len(rows), dtype=np.int8)
+    return sp.csr_matrix((data, (rows, cols)), shape=(len(women_ids), len(men_ids)))
+
+
+def like_matrix(senders, recipients, num_users):
+    """
+    Sender x recipient CSR matrix of likes, from integer user positions
+    (e.g. results_io's trace_user / trace_candidate filtered by trace_liked).
+    """
+    data = np.ones(len(senders), dtype=np.int32)
+    return sp.csr_matrix((data, (senders, recipients)), shape=(num_users, num_users))
+
+
+def gini(values):
+    """Gini coefficient of a non-negative 1-D array (0 = equal, ->1 = concentrated)."""
+    x = np.sort(np.asarray(values, dtype=float))
+    n = len(x)
+    total = x.sum()
+    if n == 0 or total == 0:
+        return 0.0
+    ranks = np.arange(1, n + 1)
+    return float(2 * np.dot(ranks, x) / (n * total) - (n + 1) / n)
+
+
+def top_share(values, fraction=0.1):
+    """Share of the total held by the top `fraction` of entries."""
+    x = np.sort(np.asarray(values, dtype=float))[::-1]
+    total = x.sum()
+    if total == 0:
+        return 0.0
+    k = max(int(np.ceil(fraction * len(x))), 1)
+    return float(x[:k].sum() / total)
+
+
+def degree_distribution(degrees):
+    """counts[d] = number of users with degree d."""
+    return np.bincount(np.asarray(degrees, dtype=np.int64))
+
+
+def match_components(match_csr):
+    """
+    Connected components of the bipartite match graph. Returns
+    (number of components with at least one match, size of the largest
+    component, number of users with no match).
+    """
+    n_women, n_men = match_csr.shape
+    graph = sp.bmat([[None, match_csr], [match_csr.T, None]], format="csr")
+    _, labels = connected_components(graph, directed=False)
+    degrees = np.diff(graph.indptr)
+    sizes = np.bincount(labels)
+    matched_components = np.unique(labels[degrees > 0])
+    largest = int(sizes[matched_components].max()) if len(matched_components) else 0
+    return len(matched_components), largest, int((degrees == 0).sum())
+
+
+def network_metrics(match_csr, like_csr, num_women):
+    """
+    All metrics as a flat dict. Users are ordered women first, then men, in
+    like_csr, matching all_user_ids in backend.py.
+    """
+    degrees = {
+        "W": np.asarray(match_csr.sum(axis=1)).ravel(),
+        "M": np.asarray(match_csr.sum(axis=0)).ravel(),
+    }
+    likes_received = np.asarray(like_csr.sum(axis=0)).ravel()
+    likes_sent = np.asarray(like_csr.sum(axis=1)).ravel()
+    received = {"W": likes_received[:num_women], "M": likes_received[num_women:]}
+    sent = {"W": likes_sent[:num_women], "M": likes_sent[num_women:]}
+
+    metrics = {}
+    for side, name in SIDES.items():
+        metrics[f"gini_matches_{name}"] = gini(degrees[side])
+        metrics[f"gini_likes_received_{name}"] = gini(received[side])
+        metrics[f"gini_likes_sent_{name}"] = gini(sent[side])
+        metrics[f"top_decile_like_share_{name}"] = top_share(received[side], 0.1)
+        metrics[f"top_decile_match_share_{name}"] = top_share(degrees[side], 0.1)
+        metrics[f"match_degree_distribution_{name}"] = degree_distribution(degrees[side])
+    components, largest, unmatched = match_components(match_csr)
+    metrics["match_components"] = components
+    metrics["largest_match_component"] = largest
+    metrics["unmatched_users"] = unmatched
+    return metrics
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from provision import atomic_write, file_lock, matrix_path, read_manifest, LOCK_FILE
+
+##############################################################################
+# PROFILE-STATISTICS INDEX
+##############################################################################
+# Per-user desirability statistics computed once per matrix version in a
+# single streaming pass over row blocks of the memory-mapped matrices, so the
+# full matrix never has to be resident. For every user we keep:
+#
+#   mean_given / var_given        - over the user's own row (how much they like others)
+#   mean_received / var_received  - over the user's column in the other
+#                                   side's matrix (how much others like them)
+#   percentile_<stat>             - the user's rank within their side, 0-100
+#   order_<stat>                  - user positions sorted ascending by <stat>
+#
+# The sorted orders make persona selection ("the 10th-percentile man") an
+# O(1) lookup. The index is stored as profile_stats_<hash>.npz next to the
+# matrices, where <hash> comes from the matrix checksums and row/column ids in
+# the manifest.
+
+# side -> (matrix whose rows are this side, matrix whose columns are this side)
+SIDE_MATRICES = {
+    "W": ("probability_matrix_women_likes_men", "probability_matrix_men_likes_women"),
+    "M": ("probability_matrix_men_likes_women", "probability_matrix_women_likes_men"),
+}
+STATS = ("mean_given", "var_given", "mean_received", "var_received")
+RANKED_STATS = ("mean_given", "mean_received")
+
+
+def index_path(data_dir="."):
+    """Location of the index for the matrices currently in `data_dir`."""
+    manifest = read_manifest(data_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No data manifest in {data_dir!r}; call ensure_data() first.")
+    h = hashlib.sha256()
+    for side in sorted(SIDE_MATRICES):
+        name = SIDE_MATRICES[side][0]
+        h.update(manifest["files"][name + ".npy"]["sha256"].encode("utf8"))
+        h.update(json.dumps(manifest["matrices"][name]).encode("utf8"))
+    return os.path.join(data_dir, f"profile_stats_{h.hexdigest()[:16]}.npz")
+
+
+def _streaming_stats(matrix, block_rows):
+    """Row and column mean/variance of a 2-D array, reading block_rows rows at a time."""
+    n_rows, n_cols = matrix.shape
+    row_mean = np.empty(n_rows)
+    row_var = np.empty(n_rows)
+    col_sum = np.zeros(n_cols)
+    col_sumsq = np.zeros(n_cols)
+    for start in range(0, n_rows, block_rows):
+        block = np.asarray(matrix[start:start + block_rows], dtype=float)
+        row_mean[start:start + len(block)] = block.mean(axis=1)
+        row_var[start:start + len(block)] = block.var(axis=1)
+        col_sum += block.sum(axis=0)
+        col_sumsq += np.square(block).sum(axis=0)
+    col_mean = col_sum / n_rows
+    col_var = np.maximum(col_sumsq / n_rows - np.square(col_mean), 0.0)
+    return row_mean, row_var, col_mean, col_var
+
+
+def build_profile_index(data_dir=".", block_rows=1024):
+    """
+    Compute the index for the provisioned matrices in `data_dir` and return
+    it as a dict of arrays keyed "<side>_<stat>" (side is "W" or "M"), plus
+    "<side>_ids" and "<side>_closest_to_mean".
+    """
+    manifest = read_manifest(data_dir)
+    stats = {}
+    received = {}
+    for side, (rows_name, _) in SIDE_MATRICES.items():
+        matrix = np.load(matrix_path(rows_name, data_dir), mmap_mode="r")
+        row_mean, row_var, col_mean, col_var = _streaming_stats(matrix, block_rows)
+        other = "M" if side == "W" else "W"
+        stats[side + "_ids"] = np.array(manifest["matrices"][rows_name]["rows"])
+        stats[side + "_mean_given"] = row_mean
+        stats[side + "_var_given"] = row_var
+        # This matrix's columns are the other side, liked by this side.
+        received[other] = (manifest["matrices"][rows_name]["columns"], col_mean, col_var)
+
+    # Column order need not match the other matrix's row order (hand-edited
+    # CSVs are adopted as-is), so line the received stats up by id.
+    for side, (col_ids, col_mean, col_var) in received.items():
+        position = {uid: k for k, uid in enumerate(col_ids)}
+        try:
+            order = np.array([position[uid] for uid in stats[side + "_ids"]], dtype=np.intp)
+        except KeyError as e:
+            raise ValueError(f"User {e.args[0]!r} has a row but no column in the probability matrices.") from None
+        if len(order) != len(col_ids):
+            raise ValueError("The probability matrices list different users as rows and columns.")
+        stats[side + "_mean_received"] = col_mean[order]
+        stats[side + "_var_received"] = col_var[order]
+
+    for side in SIDE_MATRICES:
+        n = len(stats[side + "_ids"])
+        for stat in RANKED_STATS:
+            order = np.argsort(stats[f"{side}_{stat}"], kind="stable")
+            percentile = np.empty(n)
+            percentile[order] = np.arange(n) * (100.0 / max(n - 1, 1))
+            stats[f"{side}_order_{stat}"] = order
+            stats[f"{side}_percentile_{stat}"] = percentile
+        # The "Jack"/"Jill" rule: received mean closest to the side's average.
+        received = stats[side + "_mean_received"]
+        stats[side + "_closest_to_mean"] = np.argmin(np.abs(received - received.mean()))
+    return stats
+
+
+def load_profile_index(data_dir=".", block_rows=1024):
+    """
+    Load the index for the current matrices, building and persisting it on
+    first use (under the provisioning lock, so workers build it only once).
+    """
+    path = index_path(data_dir)
+    if not os.path.exists(path):
+        with file_lock(os.path.join(data_dir, LOCK_FILE)):
+            if not os.path.exists(path):
+                stats = build_profile_index(data_dir, block_rows)
+                with atomic_write(path) as f:
+                    np.savez(f, **stats)
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+def select_persona(index, side, percentile, by="mean_received"):
+    """
+    Id of the user at `percentile` (0-100) of their side ("W" or "M") when
+    ranked by `by` ("mean_received" or "mean_given"). Constant time.
+    """
+    if side not in SIDE_MATRICES:
+        raise ValueError(f"side must be one of {sorted(SIDE_MATRICES)}, got {side!r}")
+    if by not in RANKED_STATS:
+        raise ValueError(f"by must be one of {RANKED_STATS}, got {by!r}")
+    if not 0 <= percentile <= 100:
+        raise ValueError(f"percentile must be between 0 and 100, got {percentile!r}")
+    order = index[f"{side}_order_{by}"]
+    position = order[int(round(percentile / 100.0 * (len(order) - 1)))]
+    return str(index[side + "_ids"][position])
+
+
+def profile_summary(index, user_id):
+    """All statistics for one user id, as a plain dict."""
+    side = user_id[0]
+    position = int(np.flatnonzero(index[side + "_ids"] == user_id)[0])
+    summary = {stat: float(index[f"{side}_{stat}"][position]) for stat in STATS}
+    for stat in RANKED_STATS:
+        summary["percentile_" + stat] = float(index[f"{side}_percentile_{stat}"][position])
+    return summary
@@ -0,0 +1,267 @@
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: fall back to an unlocked first run
+    fcntl = None
+
+##############################################################################
+# FIRST-RUN DATA PROVISIONING
+##############################################################################
+# Generates the synthetic profiles and probability matrices in-process (see
+# init.generate_data) and writes them so that concurrent gunicorn workers can
+# all call ensure_data() at boot:
+#
+#   - one worker takes an exclusive file lock and generates; the others block
+#     on the lock and then find the finished artifacts,
+#   - every file is written to a temp file and renamed into place, so readers
+#     never see a half-written CSV,
+#   - a manifest records the cache key (generator source + parameters) and the
+#     sha256 of every artifact; a matching manifest means nothing to do,
+#   - a provisional manifest (no files, "complete": false) is written before
+#     generating, so CSVs left behind by an interrupted run are regenerated
+#     instead of being adopted as hand-edited data.
+#
+# Besides the CSVs, each probability matrix is also stored as a .npy file so
+# workers can np.load(..., mmap_mode="r") it and share the page cache.
+
+PROFILE_TABLES = ("synthetic_women_profiles", "synthetic_men_profiles")
+MATRIX_TABLES = ("probability_matrix_women_likes_men", "probability_matrix_men_likes_women")
+
+MANIFEST_FILE = "data_manifest.json"
+LOCK_FILE = ".data_provision.lock"
+
+DEFAULT_PARAMS = {"num_women": 100, "num_men": 100, "seed": 42}
+
+
+def cache_key(params):
+    """
+    Content hash identifying one generated dataset: the generator's source
+    code plus the parameters it was called with.
+    """
+    import init
+
+    h = hashlib.sha256()
+    h.update(inspect.getsource(init).encode("utf8"))
+    h.update(json.dumps(params, sort_keys=True).encode("utf8"))
+    return h.hexdigest()
+
+
+def file_sha256(path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def matrix_path(name, data_dir="."):
+    return os.path.join(data_dir, name + ".npy")
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive inter-process lock held for the duration of the block."""
+    with open(path, "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def atomic_write(path, mode="wb"):
+    """
+    Open a temp file next to `path` and rename it over `path` on success, so
+    other processes see either the old file or the complete new one.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_manifest(data_dir="."):
+    try:
+        with open(os.path.join(data_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def manifest_is_current(manifest, key, data_dir=".", verify=False, keep_adopted=True):
+    """
+    True if every artifact listed in the manifest exists with the recorded
+    size (and hash, when `verify` is set) and the manifest was produced for
+    `key`. Manifests adopted from pre-existing CSVs have key None and are
+    kept when `keep_adopted` is set, so hand-edited data is not overwritten
+    unless specific parameters were asked for. A provisional manifest from
+    an interrupted generation is never current.
+    """
+    if manifest is None:
+        return False
+    if manifest.get("key") != key and not (keep_adopted and manifest.get("key") is None):
+        return False
+    if not manifest.get("complete", True):
+        return False
+    for name, entry in manifest["files"].items():
+        path = os.path.join(data_dir, name)
+        if not os.path.exists(path) or os.path.getsize(path) != entry["size"]:
+            return False
+        if verify and file_sha256(path) != entry["sha256"]:
+            return False
+    return True
+
+
+def _write_tables(frames, data_dir):
+    files = []
+    for name in PROFILE_TABLES:
+        path = os.path.join(data_dir, name + ".csv")
+        with atomic_write(path, "w") as f:
+            frames[name].to_csv(f, index=False)
+        files.append(name + ".csv")
+    for name in MATRIX_TABLES:
+        path = os.path.join(data_dir, name + ".csv")
+        with atomic_write(path, "w") as f:
+            frames[name].to_csv(f)
+        files.append(name + ".csv")
+    return files
+
+
+def _write_matrix_arrays(data_dir):
+    """
+    Store each probability matrix CSV as .npy. The arrays are parsed back from
+    the CSVs so the mmap path sees exactly the values pd.read_csv would.
+    """
+    frames = {
+        name: pd.read_csv(os.path.join(data_dir, name + ".csv"), index_col=0)
+        for name in MATRIX_TABLES
+    }
+    files = []
+    for name in MATRIX_TABLES:
+        with atomic_write(matrix_path(name, data_dir)) as f:
+            np.save(f, frames[name].to_numpy(dtype=float))
+        files.append(name + ".npy")
+    return files, frames
+
+
+def _write_provisional_manifest(key, params, data_dir):
+    manifest = {"key": key, "params": params, "complete": False, "files": {}}
+    with atomic_write(os.path.join(data_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f)
+
+
+def _write_manifest(key, params, files, frames, data_dir):
+    manifest = {
+        "key": key,
+        "params": params,
+        "complete": True,
+        "files": {
+            name: {
+                "size": os.path.getsize(os.path.join(data_dir, name)),
+                "sha256": file_sha256(os.path.join(data_dir, name)),
+            }
+            for name in files
+        },
+        "matrices": {
+            name: {
+                "rows": [str(x) for x in frames[name].index],
+                "columns": [str(x) for x in frames[name].columns],
+            }
+            for name in MATRIX_TABLES
+        },
+    }
+    with atomic_write(os.path.join(data_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+def _existing_csvs(data_dir):
+    names = PROFILE_TABLES + MATRIX_TABLES
+    if all(os.path.exists(os.path.join(data_dir, n + ".csv")) for n in names):
+        return names
+    return None
+
+
+def ensure_data(data_dir=".", force=False, verify=False, **params):
+    """
+    Make sure the profile CSVs, probability matrices and manifest exist in
+    `data_dir`, generating them at most once across concurrent processes.
+
+    Keyword arguments override DEFAULT_PARAMS and are passed to
+    init.generate_data. Without them, whatever dataset is already provisioned
+    in `data_dir` is kept (regenerated only if init.py changed), so readers
+    such as backend.py don't clobber a custom-sized dataset. CSVs that
+    already exist without a manifest (from an older deployment or edited by
+    hand) are adopted as-is, and kept, unless parameters are passed. `force` regenerates unconditionally; `verify`
+    re-hashes every artifact instead of only checking sizes. Returns the
+    manifest dict.
+    """
+    # Fast path: no lock needed once the manifest is in place, because it is
+    # only ever written after every artifact has been renamed into place.
+    manifest = read_manifest(data_dir)
+    keep_adopted = not params
+    if not params and manifest is not None and manifest.get("params"):
+        params = manifest["params"]
+    params = {**DEFAULT_PARAMS, **params}
+    key = cache_key(params)
+    if not force and manifest_is_current(manifest, key, data_dir, verify, keep_adopted):
+        return manifest
+
+    os.makedirs(data_dir, exist_ok=True)
+    with file_lock(os.path.join(data_dir, LOCK_FILE)):
+        # Another worker may have finished while we waited for the lock.
+        manifest = read_manifest(data_dir)
+        if not force and manifest_is_current(manifest, key, data_dir, verify, keep_adopted):
+            return manifest
+
+        existing = _existing_csvs(data_dir)
+        if not force and keep_adopted and manifest is None and existing:
+            print("Found existing csv data without a manifest; adopting it.")
+            npy_files, frames = _write_matrix_arrays(data_dir)
+            files = [n + ".csv" for n in existing] + npy_files
+            return _write_manifest(None, None, files, frames, data_dir)
+
+        print("detected first run. Generating csv templates.")
+        import init
+
+        _write_provisional_manifest(key, params, data_dir)
+        files = _write_tables(init.generate_data(**params), data_dir)
+        npy_files, frames = _write_matrix_arrays(data_dir)
+        files += npy_files
+        return _write_manifest(key, params, files, frames, data_dir)
+
+
+def load_matrix(name, data_dir=".", mmap=True):
+    """
+    Load a provisioned probability matrix as a DataFrame labelled with the
+    ids from the manifest. With `mmap`, the values are a read-only view of
+    the .npy file shared with every other worker on the machine.
+    """
+    manifest = read_manifest(data_dir)
+    if manifest is None:
+        raise FileNotFoundError(
+            f"No {MANIFEST_FILE} in {data_dir!r}; call ensure_data() first."
+        )
+    values = np.load(matrix_path(name, data_dir), mmap_mode="r" if mmap else None)
+    labels = manifest["matrices"][name]
+    return pd.DataFrame(values, index=labels["rows"], columns=labels["columns"], copy=False)
@@ -0,0 +1,116 @@
+import numpy as np
+
+##############################################################################
+# RANKING POLICIES
+##############################################################################
+# A ranking policy scores a whole block of candidate rows at once. Every array
+# argument has shape (n_users, n_candidates), one row per user logging in:
+#
+#   own        - Pᵢⱼ, probability that the user likes each candidate
+#   reciprocal - Pⱼᵢ, probability that each candidate likes the user back
+#   queue      - Qⱼ, number of pending incoming likes for each candidate
+#   incoming   - True where the candidate already liked the user (pending)
+#   available  - True where the candidate may still be shown to the user
+#
+# Policy-specific weights are passed as keyword arguments. The policy returns
+# an array of scores with the same shape; higher scores are shown first.
+# Unavailable candidates are dropped by the engine, so policies do not need
+# to mask them out themselves.
+
+
+def reciprocal_queue_policy(own, reciprocal, queue, incoming, available,
+                            weight_reciprocal=1.0, weight_queue_penalty=0.5):
+    """
+    Default Tinder-style score.
+
+      - Incoming likes:    S̃₍ᵢⱼ₎ = Pᵢⱼ
+      - Fresh candidates:  S₍ᵢⱼ₎ = Pᵢⱼ * 1/(1 + w_queue*Qⱼ) * (Pⱼᵢ)^(w_reciprocal)
+    """
+    fresh = own * (1 / (1 + weight_queue_penalty * queue)) \
+            * (reciprocal ** weight_reciprocal)
+    return np.where(incoming, own, fresh)
+
+
+def mutual_compatibility_policy(own, reciprocal, queue, incoming, available,
+                                **weights):
+    """
+    Hinge-style "most compatible": rank every candidate by the probability of
+    a mutual like, Pᵢⱼ * Pⱼᵢ, ignoring queues. Incoming likes are boosted to the
+    front since the reciprocal like has already happened.
+    """
+    mutual = own * reciprocal
+    return np.where(incoming, 1 + own, mutual)
+
+
+def own_preference_policy(own, reciprocal, queue, incoming, available,
+                          **weights):
+    """
+    Naive baseline: show the candidates the user is most likely to like,
+    with no regard for reciprocity or congestion.
+    """
+    return own.astype(float, copy=True)
+
+
+RANKING_POLICIES = {
+    "reciprocal_queue": reciprocal_queue_policy,
+    "mutual_compatibility": mutual_compatibility_policy,
+    "own_preference": own_preference_policy,
+}
+
+DEFAULT_RANKING_POLICY = "reciprocal_queue"
+
+
+def get_ranking_policy(policy):
+    """
+    Resolve a policy given by name (see RANKING_POLICIES) or as a callable.
+    """
+    if callable(policy):
+        return policy
+    try:
+        return RANKING_POLICIES[policy]
+    except KeyError:
+        raise ValueError(
+            f"Unknown ranking policy {policy!r}; "
+            f"expected one of {sorted(RANKING_POLICIES)} or a callable."
+        ) from None
+
+
+def score_candidates(policy, own, reciprocal, queue, incoming, available, **weights):
+    """
+    Call a policy on a block of users and return a float score matrix.
+
+    1-D inputs are treated as a single user's row. `queue` may be given per
+    candidate (1-D) and is broadcast across the block. Unavailable candidates
+    are set to -inf so they always sort last. Raises ValueError if the policy
+    returns a NaN or infinite score for an available candidate, since such a
+    candidate could not be ranked.
+    """
+    own = np.atleast_2d(own)
+    reciprocal = np.atleast_2d(reciprocal)
+    incoming = np.atleast_2d(incoming)
+    available = np.atleast_2d(available)
+    queue = np.broadcast_to(queue, own.shape)
+
+    scores = np.asarray(
+        policy(own, reciprocal, queue, incoming, available, **weights),
+        dtype=float,
+    )
+    if scores.shape != own.shape:
+        raise ValueError(
+            f"Ranking policy returned shape {scores.shape}, expected {own.shape}."
+        )
+    if not np.isfinite(scores[available]).all():
+        raise ValueError(
+            "Ranking policy returned non-finite scores for available candidates; "
+            "check the policy weights."
+        )
+    return np.where(available, scores, -np.inf)
+
+
+def top_candidates(scores, k):
+    """
+    Indices of the k best-scoring available candidates in a single row,
+    best first. Ties keep the original candidate order.
+    """
+    order = np.argsort(-scores, kind="stable")[:k]
+    return order[scores[order] > -np.inf]
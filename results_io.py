@@ -0,0 +1,108 @@
+import gzip
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import zstandard
+except ImportError:  # optional: only gzip is offered without it
+    zstandard = None
+
+##############################################################################
+# COMPACT RESULT FORMAT FOR THE HTTP API
+##############################################################################
+# A finished run is flattened into plain NumPy arrays so it can be returned
+# as JSON or as a single .npz download without any plotting or templating:
+#
+#   user_ids                  - every user id; other arrays index into it
+#   trace_*                   - one entry per profile view, in trace order
+#   user_matches, user_likes_sent, user_likes_received, user_unseen_likes
+#                             - per-user counts aligned with user_ids
+#   summary_<metric>          - 0-d arrays, same keys as summarize_simulation
+#   network_<metric>          - match-network metrics (network_stats.py)
+#
+# String columns of the trace are stored as codes: trace_user/trace_candidate
+# index user_ids, trace_incoming is Source == "incoming", trace_liked is
+# Decision == "Like".
+
+NPZ_MIMETYPE = "application/x-npz"
+
+
+def simulation_arrays(daily_logs, matches, incoming_likes, summary, user_ids):
+    full_log = pd.concat(daily_logs, ignore_index=True)
+    index = {uid: k for k, uid in enumerate(user_ids)}
+    n = len(user_ids)
+
+    user = full_log["UserID"].map(index).to_numpy(dtype=np.int32)
+    candidate = full_log["CandidateID"].map(index).to_numpy(dtype=np.int32)
+    liked = (full_log["Decision"] == "Like").to_numpy()
+
+    arrays = {
+        "user_ids": np.array(user_ids),
+        "trace_day": full_log["Day"].to_numpy(dtype=np.int16),
+        "trace_user": user,
+        "trace_candidate": candidate,
+        "trace_score": full_log["Score"].to_numpy(dtype=float),
+        "trace_incoming": (full_log["Source"] == "incoming").to_numpy(),
+        "trace_like_probability": full_log["LikeProbability"].to_numpy(dtype=float),
+        "trace_random_roll": full_log["RandomRoll"].to_numpy(dtype=float),
+        "trace_liked": liked,
+        "trace_match_formed": full_log["MatchFormed"].to_numpy(dtype=bool),
+        "trace_delay": full_log["Delay"].to_numpy(dtype=np.int16),
+        "user_matches": np.array([len(matches[uid]) for uid in user_ids], dtype=np.int32),
+        "user_likes_sent": np.bincount(user[liked], minlength=n).astype(np.int32),
+        "user_likes_received": np.bincount(candidate[liked], minlength=n).astype(np.int32),
+        "user_unseen_likes": np.array([len(incoming_likes[uid]) for uid in user_ids], dtype=np.int32),
+    }
+    arrays.update(summary_arrays(summary))
+    return arrays
+
+
+def summary_arrays(summary, prefix="summary"):
+    return {f"{prefix}_{key}": np.asarray(value) for key, value in summary.items()}
+
+
+def to_npz_bytes(arrays):
+    """Uncompressed .npz; compression is negotiated per request instead."""
+    buf = io.BytesIO()
+    np.savez(buf, **arrays)
+    return buf.getvalue()
+
+
+def to_jsonable(arrays, groups=("summary", "user")):
+    """
+    Nest arrays by prefix for a JSON response, keeping only `groups`
+    (any of "summary", "user", "trace"). user_ids are included with
+    "user" or "trace", since both index into them.
+    """
+    out = {}
+    for key, value in arrays.items():
+        group, _, name = key.partition("_")
+        if key == "user_ids":
+            if "user" in groups or "trace" in groups:
+                out["user_ids"] = value.tolist()
+        elif group in groups:
+            out.setdefault(group, {})[name] = value.tolist()
+    return out
+
+
+def available_encodings():
+    """Content-codings we can produce, best first."""
+    encodings = ["gzip", "identity"]
+    if zstandard is not None:
+        encodings.insert(0, "zstd")
+    return encodings
+
+
+def encode_body(data, encoding):
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor().compress(data)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    return data
+
+
+def dumps(obj):
+    return json.dumps(obj, separators=(",", ":")).encode("utf8")